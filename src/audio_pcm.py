@@ -0,0 +1,99 @@
+"""
+PCM 音频拼接模块
+各段音频只解码一次为 int16 PCM，在内存中按采样点对齐拼接，最终封装时只做一次 AAC 编码
+"""
+
+import os
+import subprocess
+import tempfile
+import wave
+from typing import List, Optional, Sequence
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# edge-tts / gTTS 输出均为 24kHz 单声道
+SAMPLE_RATE = 24000
+CHANNELS = 1
+
+
+def write_wav(path: str, pcm: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """写出 16-bit 单声道 WAV"""
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(CHANNELS)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.ascontiguousarray(pcm, dtype='<i2').tobytes())
+
+
+def write_silence(path: str, duration: float, sample_rate: int = SAMPLE_RATE) -> float:
+    """进程内生成静音 WAV，返回精确时长"""
+    samples = max(int(round(duration * sample_rate)), 0)
+    write_wav(path, np.zeros(samples, dtype=np.int16), sample_rate)
+    return samples / sample_rate
+
+
+def _read_wav(path: str, sample_rate: int) -> Optional[np.ndarray]:
+    """参数一致的 WAV 直接读取，否则返回 None 交给 ffmpeg 重采样"""
+    try:
+        with wave.open(path, 'rb') as wav:
+            if (wav.getnchannels() != CHANNELS or wav.getsampwidth() != 2
+                    or wav.getframerate() != sample_rate):
+                return None
+            return np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2').astype(np.int16)
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def decode_clips(paths: Sequence[str], sample_rate: int = SAMPLE_RATE) -> List[np.ndarray]:
+    """把所有片段解码为 PCM：WAV 进程内读取，其余在一次 ffmpeg 调用中多路输出"""
+    clips: List[Optional[np.ndarray]] = [_read_wav(path, sample_rate) for path in paths]
+    pending = [i for i, clip in enumerate(clips) if clip is None]
+    if not pending:
+        return clips
+
+    pcm_dir = tempfile.mkdtemp()
+    try:
+        cmd = ['ffmpeg', '-y', '-v', 'error']
+        for i in pending:
+            cmd += ['-i', paths[i]]
+        pcm_paths = []
+        for input_index, i in enumerate(pending):
+            pcm_path = os.path.join(pcm_dir, f'{i:03d}.pcm')
+            pcm_paths.append(pcm_path)
+            cmd += [
+                '-map', f'{input_index}:a:0',
+                '-f', 's16le',
+                '-acodec', 'pcm_s16le',
+                '-ac', str(CHANNELS),
+                '-ar', str(sample_rate),
+                pcm_path,
+            ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error(f"Audio decode error: {result.stderr}")
+            raise RuntimeError(f"Failed to decode audio: {result.stderr}")
+
+        for i, pcm_path in zip(pending, pcm_paths):
+            clips[i] = np.fromfile(pcm_path, dtype='<i2').astype(np.int16)
+    finally:
+        for name in os.listdir(pcm_dir):
+            os.remove(os.path.join(pcm_dir, name))
+        os.rmdir(pcm_dir)
+    return clips
+
+
+def assemble(clips: Sequence[np.ndarray], durations: Optional[Sequence[float]] = None,
+             sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """按时长拼接：每段截断/补零到累计时长对应的采样点，避免舍入误差累积"""
+    if durations is None:
+        return np.concatenate(clips) if clips else np.zeros(0, dtype=np.int16)
+
+    bounds = np.rint(np.concatenate(([0.0], np.cumsum(durations))) * sample_rate).astype(np.int64)
+    pcm = np.zeros(int(bounds[-1]), dtype=np.int16)
+    for clip, start, end in zip(clips, bounds[:-1], bounds[1:]):
+        length = min(len(clip), int(end - start))
+        pcm[start:start + length] = clip[:length]
+    return pcm
@@ -0,0 +1,199 @@
+"""
+音频时长探测模块
+直接解析 MP3 帧头（Xing/Info、VBRI、逐帧统计）和 WAV 头，省去每段启动 ffprobe 进程
+"""
+
+import struct
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 比特率表（kbps）：(MPEG 版本组, 层) -> 索引 1..14
+_BITRATES = {
+    (1, 1): (32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# 采样率：版本位 -> 索引 0..2（MPEG1 / MPEG2 / MPEG2.5）
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+# 逐帧统计时允许的尾部杂数据（标签、截断帧）比例
+_MAX_TRAILING_RATIO = 0.02
+
+
+class _FrameHeader:
+    __slots__ = ('version', 'layer', 'mono', 'bitrate', 'sample_rate', 'samples', 'length')
+
+    def __init__(self, version, layer, mono, bitrate, sample_rate, samples, length):
+        self.version = version
+        self.layer = layer
+        self.mono = mono
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.samples = samples
+        self.length = length
+
+
+def _parse_frame_header(data: bytes, pos: int) -> Optional[_FrameHeader]:
+    """解析 `pos` 处的 MPEG 音频帧头，非法时返回 None"""
+    if pos + 4 > len(data):
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    layer = 4 - layer_bits
+    version_group = 1 if version_bits == 3 else 2
+    bitrate = _BITRATES[(version_group, layer)][bitrate_index - 1] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][rate_index]
+    padding = (b2 >> 1) & 0x01
+    mono = (b3 >> 6) == 3
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or version_group == 1) else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+    return _FrameHeader(version_group, layer, mono, bitrate, sample_rate, samples, length)
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """跳过开头的 ID3v2 标签"""
+    pos = 0
+    while data[pos:pos + 3] == b'ID3' and pos + 10 <= len(data):
+        size = 0
+        for byte in data[pos + 6:pos + 10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if data[pos + 5] & 0x10 else 0
+        pos += 10 + size + footer
+    return pos
+
+
+def _find_first_frame(data: bytes, start: int) -> Optional[int]:
+    """找到第一个后面紧跟合法帧的帧头（避免误把数据当同步字）"""
+    pos = data.find(b'\xff', start)
+    while 0 <= pos < len(data) - 4:
+        header = _parse_frame_header(data, pos)
+        if header and (pos + header.length >= len(data)
+                       or _parse_frame_header(data, pos + header.length)):
+            return pos
+        pos = data.find(b'\xff', pos + 1)
+    return None
+
+
+def _vbr_header_duration(data: bytes, pos: int, header: _FrameHeader) -> Optional[float]:
+    """首帧中的 Xing/Info 或 VBRI 头给出总帧数"""
+    if header.layer != 3:
+        return None
+    if header.version == 1:
+        side_info = 17 if header.mono else 32
+    else:
+        side_info = 9 if header.mono else 17
+
+    xing = pos + 4 + side_info
+    tag = data[xing:xing + 4]
+    if tag in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', data[xing + 4:xing + 8])[0]
+        if not flags & 0x01:
+            return None
+        frames = struct.unpack('>I', data[xing + 8:xing + 12])[0]
+        offset = xing + 8 + 4
+        if flags & 0x02:
+            offset += 4
+        if flags & 0x04:
+            offset += 100
+        if flags & 0x08:
+            offset += 4
+        samples = frames * header.samples
+        # LAME 扩展头记录编码器延迟与尾部填充，解码器会去掉这部分
+        if data[offset:offset + 4] == b'LAME' and offset + 24 <= len(data):
+            delay_padding = int.from_bytes(data[offset + 21:offset + 24], 'big')
+            samples -= (delay_padding >> 12) + (delay_padding & 0xFFF)
+        return max(samples, 0) / header.sample_rate
+
+    vbri = pos + 4 + 32
+    if data[vbri:vbri + 4] == b'VBRI':
+        frames = struct.unpack('>I', data[vbri + 14:vbri + 18])[0]
+        return frames * header.samples / header.sample_rate
+    return None
+
+
+def mp3_duration(data: bytes) -> Optional[float]:
+    """MP3 时长：优先读 VBR 头，否则逐帧累加采样数"""
+    start = _find_first_frame(data, _skip_id3v2(data))
+    if start is None:
+        return None
+    first = _parse_frame_header(data, start)
+
+    duration = _vbr_header_duration(data, start, first)
+    if duration is not None:
+        return duration
+
+    total_samples = 0
+    pos = start
+    while True:
+        header = _parse_frame_header(data, pos)
+        if header is None or header.sample_rate != first.sample_rate or pos + header.length > len(data):
+            break
+        total_samples += header.samples
+        pos += header.length
+
+    # 帧序列中途断开（非尾部标签）时不可信，交给 ffprobe
+    if len(data) - pos > max(128 + 32, len(data) * _MAX_TRAILING_RATIO):
+        return None
+    return total_samples / first.sample_rate
+
+
+def wav_duration(data: bytes) -> Optional[float]:
+    """WAV 时长：data 块大小 / fmt 块的字节率"""
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+    pos = 12
+    byte_rate = None
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        chunk_size = struct.unpack('<I', data[pos + 4:pos + 8])[0]
+        if chunk_id == b'fmt ' and chunk_size >= 16:
+            byte_rate = struct.unpack('<I', data[pos + 16:pos + 20])[0]
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None
+            # 流式写出的 WAV 可能把大小记为 0xFFFFFFFF，以实际长度为准
+            size = min(chunk_size, len(data) - pos - 8)
+            return size / byte_rate
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """解析文件头得到时长（秒）；无法识别的格式返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        logger.debug(f"Failed to read {path} for duration probe: {e}")
+        return None
+
+    if data[:4] == b'RIFF':
+        return wav_duration(data)
+    try:
+        return mp3_duration(data)
+    except (struct.error, IndexError) as e:
+        logger.debug(f"MP3 header parse failed for {path}: {e}")
+        return None
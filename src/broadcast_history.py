@@ -0,0 +1,149 @@
+"""
+播报历史模块
+已播报新闻的指纹（规范化标题哈希 + MinHash 签名 + 播报日期）保存在 SQLite 中，
+筛选新闻时批量查询近几天是否已播过，超过保留期的记录自动清理
+"""
+
+import hashlib
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence
+import logging
+
+from near_dedup import MinHasher, jaccard, normalize_text, shingles
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS stories ('
+    'fingerprint TEXT PRIMARY KEY, normalized TEXT NOT NULL, title TEXT NOT NULL, '
+    'signature BLOB NOT NULL, air_date TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS bands ('
+    'band_key TEXT NOT NULL, fingerprint TEXT NOT NULL, PRIMARY KEY (band_key, fingerprint))',
+    'CREATE INDEX IF NOT EXISTS stories_air_date ON stories (air_date)',
+)
+
+# SQLite 单条语句的参数个数上限较低，IN 查询分批进行
+_QUERY_CHUNK = 500
+
+
+def fingerprint(text: str) -> str:
+    """规范化标题的哈希"""
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class BroadcastHistory:
+    """跨天的已播报新闻索引（数据库不可用时不做历史过滤）"""
+
+    def __init__(self, path: str, window_days: int = 3, retention_days: int = 14,
+                 threshold: float = 0.5, hasher: Optional[MinHasher] = None):
+        self.path = path
+        self.window_days = window_days
+        self.retention_days = max(retention_days, window_days)
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self.available = True
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with self._connect() as conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Broadcast history unavailable ({e}), repeats will not be filtered")
+            self.available = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """一个事务：正常结束提交，异常回滚，最后关闭连接"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def find_aired(self, titles: Sequence[str], today: date) -> Dict[int, str]:
+        """批量查询窗口期内（不含当天）已播过的标题，返回 {下标: 播报日期}"""
+        if not self.available or self.window_days <= 0 or not titles:
+            return {}
+
+        since = (today - timedelta(days=self.window_days)).isoformat()
+        until = today.isoformat()
+        shingle_sets = [shingles(title) for title in titles]
+        fingerprints = [fingerprint(title) for title in titles]
+        band_keys = [self.hasher.band_keys(self.hasher.signature(s)) if s else [] for s in shingle_sets]
+
+        try:
+            with self._connect() as conn:
+                # 候选：规范化标题完全相同，或任一 LSH band 相同
+                keys = sorted({key for item_keys in band_keys for key in item_keys})
+                candidates = set(fingerprints)
+                for start in range(0, len(keys), _QUERY_CHUNK):
+                    chunk = keys[start:start + _QUERY_CHUNK]
+                    rows = conn.execute(
+                        f"SELECT fingerprint FROM bands WHERE band_key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    candidates.update(row[0] for row in rows)
+
+                stories = {}
+                candidate_list = sorted(candidates)
+                for start in range(0, len(candidate_list), _QUERY_CHUNK):
+                    chunk = candidate_list[start:start + _QUERY_CHUNK]
+                    rows = conn.execute(
+                        'SELECT fingerprint, normalized, air_date FROM stories '
+                        f"WHERE fingerprint IN ({','.join('?' * len(chunk))}) "
+                        'AND air_date >= ? AND air_date < ?',
+                        [*chunk, since, until]
+                    ).fetchall()
+                    for fp, normalized, air_date in rows:
+                        stories[fp] = (shingles(normalized), air_date)
+        except sqlite3.Error as e:
+            logger.warning(f"Broadcast history query failed: {e}")
+            return {}
+
+        aired = {}
+        for i, (shingle_set, fp) in enumerate(zip(shingle_sets, fingerprints)):
+            if fp in stories:
+                aired[i] = stories[fp][1]
+                continue
+            for story_shingles, air_date in stories.values():
+                if jaccard(shingle_set, story_shingles) >= self.threshold:
+                    aired[i] = air_date
+                    break
+        return aired
+
+    def record(self, titles: Sequence[str], air_date: date):
+        """记录当天播报的新闻，并清理超过保留期的记录"""
+        if not self.available:
+            return
+
+        story_rows: List[tuple] = []
+        band_rows: List[tuple] = []
+        for title in titles:
+            normalized = normalize_text(title)
+            if not normalized:
+                continue
+            fp = fingerprint(title)
+            signature = self.hasher.signature(shingles(title))
+            story_rows.append((fp, normalized, title, signature.tobytes(), air_date.isoformat()))
+            band_rows.extend((key, fp) for key in self.hasher.band_keys(signature))
+
+        cutoff = (air_date - timedelta(days=self.retention_days)).isoformat()
+        try:
+            with self._connect() as conn:
+                conn.executemany('INSERT OR REPLACE INTO stories VALUES (?, ?, ?, ?, ?)', story_rows)
+                conn.executemany('INSERT OR IGNORE INTO bands VALUES (?, ?)', band_rows)
+                pruned = conn.execute('DELETE FROM stories WHERE air_date < ?', (cutoff,)).rowcount
+                if pruned:
+                    conn.execute(
+                        'DELETE FROM bands WHERE fingerprint NOT IN (SELECT fingerprint FROM stories)'
+                    )
+            logger.info(
+                f"Broadcast history: recorded {len(story_rows)} stories for {air_date.isoformat()}"
+                + (f", pruned {pruned} older than {cutoff}" if pruned else '')
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record broadcast history: {e}")
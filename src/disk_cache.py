@@ -0,0 +1,153 @@
+"""
+磁盘缓存模块
+内容寻址：每个键对应一个条目目录（文件 + meta.json），按总大小做 LRU 淘汰
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'meta.json'
+# 超限时淘汰到上限的该比例以下，留出余量，避免缓存写满后每次写入都遍历目录
+EVICT_TARGET_RATIO = 0.9
+
+
+class DiskCache:
+    """内容寻址磁盘缓存（进程内线程安全，跨进程依赖原子重命名）"""
+
+    def __init__(self, root: str, max_bytes: int, name: str = 'cache'):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 条目总大小的累计值：首次写入时扫描一次，之后按增量维护，超限时才遍历目录淘汰
+        self._total: Optional[int] = None
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(payload: Any) -> str:
+        """对任意可 JSON 序列化的内容求稳定哈希"""
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    @staticmethod
+    def _dir_size(path: Path) -> int:
+        try:
+            return sum(p.stat().st_size for p in path.iterdir())
+        except OSError:
+            return 0
+
+    def path(self, key: str, name: str) -> str:
+        """条目内文件的路径"""
+        return str(self._entry_dir(key) / name)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """读取条目元数据；命中时刷新访问时间（LRU）"""
+        meta_path = self._entry_dir(key) / META_FILE
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return meta
+
+    def put(self, key: str, meta: Dict, files: Optional[Dict[str, str]] = None,
+            blobs: Optional[Dict[str, bytes]] = None) -> bool:
+        """写入条目：`files` 为 {条目内文件名: 源路径}，`blobs` 为 {文件名: 内容}"""
+        final_dir = self._entry_dir(key)
+        tmp_dir = self.root / f'.tmp-{uuid.uuid4().hex}'
+        try:
+            tmp_dir.mkdir(parents=True)
+            for name, src in (files or {}).items():
+                shutil.copyfile(src, tmp_dir / name)
+            for name, data in (blobs or {}).items():
+                (tmp_dir / name).write_bytes(data)
+            meta = dict(meta)
+            meta['stored_at'] = time.time()
+            with open(tmp_dir / META_FILE, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            new_size = self._dir_size(tmp_dir)
+
+            final_dir.parent.mkdir(parents=True, exist_ok=True)
+            old_size = 0
+            if final_dir.exists():
+                old_size = self._dir_size(final_dir)
+                shutil.rmtree(final_dir, ignore_errors=True)
+            os.replace(tmp_dir, final_dir)
+        except OSError as e:
+            logger.warning(f"Failed to store {self.name} entry {key[:12]}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        with self._lock:
+            if self._total is None:
+                # 首次写入：扫描结果已包含刚写入的条目
+                self._total = sum(size for _, size, _ in self._scan())
+            else:
+                self._total += new_size - old_size
+            if self._total > self.max_bytes:
+                self._evict_locked()
+        return True
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """遍历全部条目：(最近访问时间, 大小, 目录)"""
+        entries = []
+        for bucket in self.root.iterdir():
+            if not bucket.is_dir() or bucket.name.startswith('.tmp-'):
+                continue
+            for entry in bucket.iterdir():
+                try:
+                    size = sum(p.stat().st_size for p in entry.iterdir())
+                    atime = (entry / META_FILE).stat().st_mtime
+                except OSError:
+                    continue
+                entries.append((atime, size, entry))
+        return entries
+
+    def evict(self):
+        """总大小超限时按最近访问时间从旧到新删除条目，直到降至上限的 EVICT_TARGET_RATIO"""
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self):
+        # 重新遍历以校正累计值（其他进程也可能写入同一目录）
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        self._total = total
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        target = int(self.max_bytes * EVICT_TARGET_RATIO)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        self._total = total
+        logger.info(f"{self.name} cache evicted {removed} entries, now {total / 1e6:.1f}MB")
+
+    def summary(self) -> str:
+        return f"{self.name} cache: {self.hits} hits, {self.misses} misses"
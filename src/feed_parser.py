@@ -0,0 +1,88 @@
+"""
+RSS/Atom 流式解析模块
+基于 iterparse 单遍解析 RSS item 与 Atom entry，边解析边清理节点，调用方取够条目后可随时停止
+"""
+
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENTRY_TAGS = {'item', 'entry'}
+
+# 各字段按优先级匹配的子节点名（忽略命名空间，兼容 RSS 2.0 / RSS 1.0 / Atom）
+FIELD_TAGS = {
+    'title': ['title'],
+    'summary': ['description', 'summary', 'encoded', 'content'],
+    'published': ['pubDate', 'published', 'updated', 'date'],
+}
+
+
+@dataclass
+class FeedEntry:
+    """一条 RSS item / Atom entry 的原始字段"""
+    title: str
+    summary: str
+    link: str
+    published: str
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _first(fields: Dict[str, str], names: List[str]) -> str:
+    for name in names:
+        if fields.get(name):
+            return fields[name]
+    return ''
+
+
+def iter_feed_entries(stream: BinaryIO) -> Iterator[FeedEntry]:
+    """逐条产出 RSS/Atom 条目；已处理的条目节点立即从树上移除，内存占用与 feed 大小无关"""
+    path: List[ET.Element] = []
+    # 当前条目在 path 中的深度（不在条目内时为 -1）
+    entry_depth = -1
+    fields: Dict[str, str] = {}
+    links: Dict[str, str] = {}
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if entry_depth < 0 and _local_name(elem.tag) in ENTRY_TAGS:
+                entry_depth = len(path)
+                fields, links = {}, {}
+            path.append(elem)
+            continue
+
+        path.pop()
+        name = _local_name(elem.tag)
+
+        if entry_depth >= 0 and len(path) == entry_depth + 1:
+            # 条目的直接子节点：每个字段只保留第一次出现的值
+            if name == 'link':
+                # Atom 优先取 rel=alternate 的 href，RSS 取节点文本
+                href = (elem.attrib.get('href') or '').strip()
+                kind = elem.attrib.get('rel', 'alternate') if href else 'text'
+                links.setdefault(kind, href or (elem.text or '').strip())
+            elif name not in fields:
+                fields[name] = ''.join(elem.itertext()).strip()
+            continue
+
+        if len(path) == entry_depth:
+            entry_depth = -1
+            elem.clear()
+            if path:
+                path[-1].remove(elem)
+            title = _first(fields, FIELD_TAGS['title'])
+            if title:
+                yield FeedEntry(
+                    title=title,
+                    summary=_first(fields, FIELD_TAGS['summary']),
+                    link=links.get('alternate') or links.get('text') or next(iter(links.values()), ''),
+                    published=_first(fields, FIELD_TAGS['published']),
+                )
+        elif entry_depth < 0 and path:
+            # 频道级节点（标题、图片等）用完即清
+            elem.clear()
@@ -0,0 +1,198 @@
+"""
+字体注册模块
+进程内共享：字体只扫描一次，FreeType 字体对象按 (角色, 字号, 序号) 复用，
+并按码位记录字形覆盖，缺字（emoji、生僻字）时选用兜底字体
+"""
+
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+# 常见中文字体路径（按优先级）
+PREFERRED_FONTS = [
+    '/usr/share/fonts/truetype/noto/NotoSansCJK-Bold.ttc',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+    '/System/Library/Fonts/PingFang.ttc',
+    '/System/Library/Fonts/STHeiti Light.ttc',
+    'C:/Windows/Fonts/simhei.ttf',
+    'C:/Windows/Fonts/simsun.ttc',
+    'C:/Windows/Fonts/msyh.ttc',
+]
+
+FONT_DIRS = [
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    '~/.fonts',
+    '~/.local/share/fonts',
+    '/System/Library/Fonts',
+    '/Library/Fonts',
+    'C:/Windows/Fonts',
+]
+
+# 扫描结果中可作为兜底字体的文件名关键字（按优先级）
+FALLBACK_HINTS = ['notosanscjk', 'notoserifcjk', 'wqy', 'droidsansfallback', 'emoji', 'symbol', 'dejavusans']
+
+FONT_EXTENSIONS = ('.ttf', '.ttc', '.otf')
+MAX_FALLBACK_FACES = 8
+
+# 彩色 emoji 等位图字体只支持固定字号
+_BITMAP_FONT_SIZES = (109,)
+_NOTDEF_PROBE = '\uffff'
+
+FaceSpec = Tuple[str, int]
+
+
+@lru_cache(maxsize=1)
+def discover_fonts() -> Tuple[str, ...]:
+    """扫描系统字体目录（每个进程只扫描一次）"""
+    found = []
+    for font_dir in FONT_DIRS:
+        root_dir = os.path.expanduser(font_dir)
+        if not os.path.isdir(root_dir):
+            continue
+        for root, _, files in os.walk(root_dir):
+            for name in files:
+                if name.lower().endswith(FONT_EXTENSIONS):
+                    found.append(os.path.join(root, name))
+    return tuple(sorted(found))
+
+
+class FontRegistry:
+    """字体注册表：字体发现、字体对象复用、逐码位兜底"""
+
+    ROLES = ('title', 'subtitle', 'body')
+
+    def __init__(self, preferred_fonts: Optional[List[str]] = None):
+        self.chain: List[FaceSpec] = self._build_chain(preferred_fonts or PREFERRED_FONTS)
+        primary = self.chain[0][0] if self.chain else None
+        self.font_paths: Dict[str, Optional[str]] = {role: primary for role in self.ROLES}
+        if primary:
+            logger.info(f"Found font: {primary} (+{len(self.chain) - 1} fallback faces)")
+        else:
+            logger.warning("No Chinese font found, using default")
+
+        self._faces: Dict[Tuple[str, int, int], Optional[ImageFont.FreeTypeFont]] = {}
+        # 探测字体与其 .notdef 字形签名成对保存，其他线程不会看到只有字体没有签名的中间状态
+        self._probe_faces: Dict[FaceSpec, Tuple[Optional[ImageFont.FreeTypeFont], Optional[Tuple]]] = {}
+        # 码位覆盖索引：(角色, 码位) -> 兜底链中的序号
+        self._coverage: Dict[Tuple[str, int], int] = {}
+
+    def _build_chain(self, preferred_fonts: List[str]) -> List[FaceSpec]:
+        """主字体 + 兜底字体链"""
+        chain: List[str] = [path for path in preferred_fonts if os.path.exists(path)]
+        discovered = discover_fonts()
+        for hint in FALLBACK_HINTS:
+            for path in discovered:
+                if hint in os.path.basename(path).lower().replace('-', '').replace('_', ''):
+                    if path not in chain:
+                        chain.append(path)
+        return [(path, 0) for path in chain[:MAX_FALLBACK_FACES]]
+
+    def _load_face(self, spec: FaceSpec, size: int) -> Optional[ImageFont.FreeTypeFont]:
+        path, face_index = spec
+        try:
+            return ImageFont.truetype(path, size, index=face_index)
+        except Exception as e:
+            logger.debug(f"Failed to load font {path}@{size}: {e}")
+            return None
+
+    def _face(self, role: str, size: int, index: int) -> Optional[ImageFont.FreeTypeFont]:
+        key = (role, size, index)
+        if key not in self._faces:
+            face = self._load_face(self.chain[index], size) if index < len(self.chain) else None
+            if face is None and index == 0 and self.chain:
+                logger.warning(f"Failed to load font {self.chain[0][0]}")
+            self._faces[key] = face
+        return self._faces[key]
+
+    def get_font(self, role: str, size: int, index: int = 0) -> ImageFont.FreeTypeFont:
+        """获取 (角色, 字号, 兜底序号) 对应的字体，同一进程内只加载一次"""
+        face = self._face(role, size, index)
+        if face is None:
+            return ImageFont.load_default()
+        return face
+
+    def _probe_face(self, spec: FaceSpec) -> Tuple[Optional[ImageFont.FreeTypeFont], Optional[Tuple]]:
+        """用于检测字形覆盖的小字号字体及其 .notdef 签名（位图字体退回其固定字号）"""
+        probe = self._probe_faces.get(spec)
+        if probe is None:
+            face = self._load_face(spec, 32)
+            for size in _BITMAP_FONT_SIZES:
+                if face is not None:
+                    break
+                face = self._load_face(spec, size)
+            notdef = self._glyph_signature(face, _NOTDEF_PROBE) if face is not None else None
+            probe = (face, notdef)
+            self._probe_faces[spec] = probe
+        return probe
+
+    @staticmethod
+    def _glyph_signature(face: ImageFont.FreeTypeFont, char: str) -> Tuple:
+        mask = face.getmask(char)
+        return (mask.size, bytes(mask))
+
+    def has_glyph(self, spec: FaceSpec, char: str) -> bool:
+        """字体是否包含该字符（与 .notdef 字形比较）"""
+        face, notdef = self._probe_face(spec)
+        if face is None:
+            return False
+        return self._glyph_signature(face, char) != notdef
+
+    def face_index_for(self, role: str, char: str) -> int:
+        """字符在兜底链中的首个可用字体序号（按码位缓存）"""
+        key = (role, ord(char))
+        index = self._coverage.get(key)
+        if index is None:
+            index = 0
+            if not char.isspace():
+                for i, spec in enumerate(self.chain):
+                    if self.has_glyph(spec, char):
+                        index = i
+                        break
+            self._coverage[key] = index
+        return index
+
+    def _usable_index(self, role: str, size: int, char: str) -> int:
+        index = self.face_index_for(role, char) if len(self.chain) > 1 else 0
+        if index and self._face(role, size, index) is None:
+            # 兜底字体不支持该字号（如位图 emoji），退回主字体
+            index = 0
+        return index
+
+    def font_for_char(self, role: str, size: int, char: str) -> ImageFont.FreeTypeFont:
+        """绘制该字符实际使用的字体"""
+        return self.get_font(role, size, self._usable_index(role, size, char))
+
+    def segment(self, text: str, role: str, size: int) -> List[Tuple[str, ImageFont.FreeTypeFont]]:
+        """把文本按可用字体切成若干连续片段"""
+        runs: List[List] = []
+        for char in text:
+            index = self._usable_index(role, size, char)
+            if runs and runs[-1][1] == index:
+                runs[-1][0] += char
+            else:
+                runs.append([char, index])
+        return [(run_text, self.get_font(role, size, index)) for run_text, index in runs]
+
+
+_registry: Optional[FontRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_font_registry() -> FontRegistry:
+    """进程级共享的字体注册表"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = FontRegistry()
+        return _registry
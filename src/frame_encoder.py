@@ -0,0 +1,143 @@
+"""
+帧编码模块
+通过管道把原始 RGB 帧直接写入 ffmpeg，省去 PNG 压缩/解压和临时目录读写
+"""
+
+import queue
+import subprocess
+import tempfile
+import threading
+from typing import Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class RawPipeEncoder:
+    """ffmpeg rawvideo 管道编码器：渲染线程入队，后台线程写 stdin，队列有界"""
+
+    def __init__(self, output_path: str, width: int, height: int, fps: float,
+                 video_codec: str = 'libx264', audio_path: Optional[str] = None,
+                 audio_codec: str = 'aac', queue_size: int = 8):
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.video_codec = video_codec
+        self.audio_path = audio_path
+        self.audio_codec = audio_codec
+        self.frames_written = 0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._process: Optional[subprocess.Popen] = None
+        self._writer: Optional[threading.Thread] = None
+        self._stderr = None
+        self._error: Optional[BaseException] = None
+
+    def _build_command(self) -> list:
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-s', f'{self.width}x{self.height}',
+            '-framerate', str(self.fps),
+            '-i', '-',
+        ]
+        if self.audio_path:
+            cmd += ['-i', self.audio_path]
+        cmd += [
+            '-c:v', self.video_codec,
+            '-pix_fmt', 'yuv420p',
+        ]
+        if self.audio_path:
+            cmd += [
+                '-c:a', self.audio_codec,
+                '-b:a', '192k',
+                '-shortest',
+            ]
+        cmd += ['-movflags', '+faststart', self.output_path]
+        return cmd
+
+    def start(self):
+        """启动 ffmpeg 进程和写入线程"""
+        # stderr 落到临时文件，避免管道写满导致 ffmpeg 阻塞
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            self._build_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._stderr
+        )
+        self._writer = threading.Thread(target=self._write_loop, name='raw-pipe-writer', daemon=True)
+        self._writer.start()
+
+    def _write_loop(self):
+        stdin = self._process.stdin
+        while True:
+            frame = self._queue.get()
+            if frame is _STOP:
+                break
+            if self._error is not None:
+                # 出错后继续消费队列，避免生产者阻塞
+                continue
+            try:
+                stdin.write(memoryview(frame).cast('B'))
+            except BaseException as e:
+                self._error = e
+        try:
+            stdin.close()
+        except OSError as e:
+            if self._error is None:
+                self._error = e
+
+    def write(self, frame: np.ndarray):
+        """写入一帧（HxWx3 uint8），队列满时阻塞等待编码追上"""
+        if self._error is not None:
+            raise RuntimeError(f"Raw pipe encoder failed: {self._error}")
+        if frame.shape != (self.height, self.width, 3) or frame.dtype != np.uint8:
+            raise ValueError(f"Unexpected frame shape/dtype: {frame.shape} {frame.dtype}")
+        self._queue.put(np.ascontiguousarray(frame))
+        self.frames_written += 1
+
+    def close(self):
+        """等待所有帧写完并结束编码，失败时抛出 RuntimeError"""
+        if self._process is None:
+            return
+        self._queue.put(_STOP)
+        self._writer.join()
+        returncode = self._process.wait()
+        self._stderr.seek(0)
+        stderr = self._stderr.read().decode('utf-8', errors='replace')
+        self._stderr.close()
+        self._process = None
+
+        if returncode != 0 or self._error is not None:
+            logger.error(f"FFmpeg error: {stderr}")
+            raise RuntimeError(f"FFmpeg raw pipe failed ({returncode}): {self._error or stderr}")
+        logger.info(f"Generated video: {self.output_path} ({self.frames_written} frames via pipe)")
+
+    def abort(self):
+        """异常时终止 ffmpeg"""
+        if self._process is None:
+            return
+        self._process.kill()
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._process.wait()
+        self._stderr.close()
+        self._process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
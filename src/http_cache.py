@@ -0,0 +1,128 @@
+"""
+HTTP 条件请求缓存模块
+响应体连同 ETag / Last-Modified 存入磁盘缓存；新鲜期（max-age）内直接复用，过期后发条件请求，304 时复用本地内容
+"""
+
+import hashlib
+import json
+import re
+import time
+from typing import Any, Dict, Optional
+import logging
+
+import requests
+
+from disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+BODY_FILE = 'body'
+
+
+class CachedResponse:
+    """与 requests.Response 用法相近的响应（只保留抓取所需的部分）"""
+
+    def __init__(self, url: str, status_code: int, content: bytes,
+                 headers: Optional[Dict[str, str]] = None, from_cache: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+        # 响应体摘要，可作为解析结果的缓存键
+        self.digest = hashlib.sha256(content).hexdigest()
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+def _max_age(headers) -> Optional[float]:
+    """Cache-Control 的新鲜期；no-store 返回 None（不缓存）"""
+    cache_control = (headers.get('Cache-Control') or '').lower()
+    if 'no-store' in cache_control:
+        return None
+    if 'no-cache' in cache_control:
+        return 0.0
+    match = re.search(r'max-age=(\d+)', cache_control)
+    return float(match.group(1)) if match else 0.0
+
+
+class CachingSession:
+    """包装 requests.Session 的 GET：新鲜期内直接命中，过期后带校验头重新验证"""
+
+    def __init__(self, session: requests.Session, cache: Optional[DiskCache] = None,
+                 min_ttl: float = 0.0):
+        self.session = session
+        self.cache = cache
+        self.min_ttl = min_ttl
+        self.revalidated = 0
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: float = 30) -> CachedResponse:
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        if not self.cache:
+            response = self.session.get(full_url, timeout=timeout)
+            return CachedResponse(full_url, response.status_code, response.content, response.headers)
+
+        key = DiskCache.make_key({'url': full_url})
+        meta = self.cache.get(key)
+        body = None
+        if meta:
+            try:
+                with open(self.cache.path(key, BODY_FILE), 'rb') as f:
+                    body = f.read()
+            except OSError:
+                meta = None
+
+        if meta and time.time() < meta['fetched_at'] + meta['ttl']:
+            return CachedResponse(full_url, 200, body, meta.get('headers'), from_cache=True)
+
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self.session.get(full_url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and meta:
+            self.revalidated += 1
+            ttl = _max_age(response.headers)
+            self._store(key, meta, body, ttl if ttl is not None else 0.0)
+            logger.debug(f"HTTP 304, reused cached body: {full_url}")
+            return CachedResponse(full_url, 200, body, meta.get('headers'), from_cache=True)
+
+        result = CachedResponse(full_url, response.status_code, response.content, response.headers)
+        if response.status_code == 200:
+            ttl = _max_age(response.headers)
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+            }
+            if ttl is not None and (ttl > 0 or self.min_ttl > 0
+                                    or validators['etag'] or validators['last_modified']):
+                self._store(key, validators, response.content, ttl)
+        return result
+
+    def _store(self, key: str, meta: Dict, body: bytes, ttl: float):
+        meta = {
+            'etag': meta.get('etag'),
+            'last_modified': meta.get('last_modified'),
+            'headers': meta.get('headers') or {},
+            'fetched_at': time.time(),
+            'ttl': max(ttl, self.min_ttl),
+        }
+        self.cache.put(key, meta, blobs={BODY_FILE: body})
+
+    def summary(self) -> str:
+        if not self.cache:
+            return "http cache: disabled"
+        return f"{self.cache.summary()}, {self.revalidated} revalidated (304)"
@@ -0,0 +1,124 @@
+"""
+新闻国内/国际分类模块
+各组关键词预编译为一个 Aho-Corasick 自动机，每条新闻的文本只扫描一遍；关键词表可从 JSON 配置加载
+"""
+
+import json
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORDS: Dict[str, List[str]] = {
+    'international_sources': [
+        'reuters', 'ap', 'associated press', 'bbc', 'cnn', 'bloomberg',
+        'financial times', 'the guardian', 'nyt', 'new york times',
+        '华尔街', '路透', '彭博', '法新社', '联合早报',
+    ],
+    'international_keywords': [
+        '美国', '日本', '欧洲', '欧盟', '英国', '法国', '德国', '俄罗斯', '乌克兰',
+        '中东', '以色列', '巴勒斯坦', '联合国', '北约', '国际', 'global', 'world',
+    ],
+    'domestic_keywords': ['中国', '国内', '国务院', '发改委', '央行', '上海', '北京', '深圳', '广州'],
+}
+
+
+class AhoCorasick:
+    """多模式匹配自动机：构建一次，之后每段文本线性扫描一遍即可找出所有命中的标签"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]]):
+        # 每个状态：转移表、失败指针、命中的标签（已沿失败链合并）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+        for pattern, label in patterns:
+            if pattern:
+                self._add(pattern, label)
+        self._build()
+
+    def _add(self, pattern: str, label: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(label)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def iter_labels(self, text: str) -> Iterator[str]:
+        """按出现位置依次产出命中的标签（同一位置可能有多个）"""
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            yield from self._output[state]
+
+
+class NewsClassifier:
+    """国内/国际粗分类；结果按 (来源, 标题, 摘要) 记忆"""
+
+    def __init__(self, keywords: Optional[Dict[str, List[str]]] = None):
+        tables = {**DEFAULT_KEYWORDS, **(keywords or {})}
+        self._source_matcher = AhoCorasick(
+            (keyword.lower(), 'international') for keyword in tables['international_sources']
+        )
+        self._text_matcher = AhoCorasick(
+            [(keyword.lower(), 'international') for keyword in tables['international_keywords']]
+            + [(keyword.lower(), 'domestic') for keyword in tables['domestic_keywords']]
+        )
+        self.cache: Dict[Tuple[str, str, str], bool] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> 'NewsClassifier':
+        """从 JSON 加载关键词表；文件中出现的分组替换默认表，未出现的沿用默认"""
+        if not path:
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            keywords = {
+                key: [str(word) for word in data[key]]
+                for key in DEFAULT_KEYWORDS if isinstance(data.get(key), list)
+            }
+            logger.info(f"Loaded news keyword tables from {path}: {', '.join(keywords) or 'none'}")
+            return cls(keywords)
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Failed to load news keywords from {path} ({e}), using defaults")
+            return cls()
+
+    def is_international(self, source: str, title: str, summary: str) -> bool:
+        key = (source or '', title or '', summary or '')
+        verdict = self.cache.get(key)
+        if verdict is None:
+            verdict = self._classify(*key)
+            self.cache[key] = verdict
+        return verdict
+
+    def _classify(self, source: str, title: str, summary: str) -> bool:
+        # 国际媒体来源直接判为国际；否则国内关键词优先于国际关键词
+        if next(self._source_matcher.iter_labels(source.lower()), None):
+            return True
+        international = False
+        for label in self._text_matcher.iter_labels(f"{title} {summary}".lower()):
+            if label == 'domestic':
+                return False
+            international = True
+        return international
@@ -0,0 +1,146 @@
+"""
+LLM 客户端模块
+OpenAI 兼容接口的共享客户端：连接池保持长连接，统一限流、代码块剥离、JSON 解析与用量统计
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import RateLimiter, get_llm_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'https://grok.oo9.dpdns.org/v1'
+DEFAULT_MODEL = 'grok-4-fast-expert'
+
+
+def strip_json_fence(text: str) -> str:
+    """兼容 ```json ... ``` 输出"""
+    match = re.search(r'```(?:json)?\s*(.*?)\s*```', text, re.S)
+    return match.group(1).strip() if match else text.strip()
+
+
+class LLMClient:
+    """x666/OpenAI 兼容 chat completions 客户端（同步 + asyncio 接口）"""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 model: Optional[str] = None, pool_size: int = 4,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.base_url = (base_url or os.getenv('X666_BASE_URL', DEFAULT_BASE_URL)).rstrip('/')
+        self.api_key = api_key if api_key is not None else (
+            os.getenv('X666_API_KEY') or os.getenv('OPENAI_API_KEY', '')
+        )
+        self.model = model or os.getenv('X666_MODEL', DEFAULT_MODEL)
+        self.rate_limiter = rate_limiter or get_llm_rate_limiter()
+
+        # 复用 TCP/TLS 连接，避免每次请求重新握手
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+        })
+
+        # 用量统计
+        self.calls = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def _record(self, latency: float, usage: Optional[Dict], failed: bool = False):
+        with self._stats_lock:
+            self.calls += 1
+            self.total_latency += latency
+            if failed:
+                self.failures += 1
+            if usage:
+                self.prompt_tokens += int(usage.get('prompt_tokens') or 0)
+                self.completion_tokens += int(usage.get('completion_tokens') or 0)
+
+    def _post(self, messages: List[Dict], temperature: float, timeout: float) -> str:
+        payload = {
+            'model': self.model,
+            'temperature': temperature,
+            'messages': messages,
+        }
+        start = time.monotonic()
+        try:
+            response = self.session.post(
+                f"{self.base_url}/chat/completions", json=payload, timeout=timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            self._record(time.monotonic() - start, None, failed=True)
+            raise
+
+        latency = time.monotonic() - start
+        usage = data.get('usage') or {}
+        self._record(latency, usage)
+        logger.info(
+            f"LLM call: {latency:.2f}s, tokens {usage.get('prompt_tokens', '?')}"
+            f"+{usage.get('completion_tokens', '?')}"
+        )
+        return (
+            data.get('choices', [{}])[0]
+            .get('message', {})
+            .get('content', '')
+            .strip()
+        )
+
+    def chat(self, messages: List[Dict], temperature: float = 0, timeout: float = 30) -> str:
+        """发送一次对话请求（受共享限流约束），返回回复文本"""
+        self.rate_limiter.acquire()
+        return self._post(messages, temperature, timeout)
+
+    def chat_json(self, messages: List[Dict], temperature: float = 0, timeout: float = 30) -> Any:
+        """发送对话请求并把回复解析为 JSON；回复为空时返回 None"""
+        content = self.chat(messages, temperature=temperature, timeout=timeout)
+        return json.loads(strip_json_fence(content)) if content else None
+
+    async def chat_async(self, messages: List[Dict], temperature: float = 0,
+                         timeout: float = 30) -> str:
+        """异步版本：限流等待和 HTTP 请求都不阻塞事件循环"""
+        await self.rate_limiter.acquire_async()
+        return await asyncio.to_thread(self._post, messages, temperature, timeout)
+
+    async def chat_json_async(self, messages: List[Dict], temperature: float = 0,
+                              timeout: float = 30) -> Any:
+        content = await self.chat_async(messages, temperature=temperature, timeout=timeout)
+        return json.loads(strip_json_fence(content)) if content else None
+
+    def summary(self) -> str:
+        return (
+            f"LLM client: {self.calls} calls ({self.failures} failed), "
+            f"{self.total_latency:.2f}s total, tokens {self.prompt_tokens}+{self.completion_tokens}"
+        )
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """进程级共享的 LLM 客户端（抓取与断句共用同一个连接池）"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
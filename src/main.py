@@ -106,6 +106,10 @@ async def main():
             logger.info(f"使用预生成新闻: {input_news_items_path}")
             script = load_json(input_script_path)
             news_items = load_json(input_news_items_path)
+            input_subtitles_path = os.getenv('INPUT_SUBTITLES_PATH', '').strip()
+            if input_subtitles_path and os.path.exists(input_subtitles_path):
+                logger.info(f"使用预生成字幕断句: {input_subtitles_path}")
+                video_generator.load_subtitle_splits(input_subtitles_path)
         else:
             logger.info("开始获取新闻...")
             use_mock = os.getenv('USE_MOCK_NEWS', 'false').lower() == 'true'
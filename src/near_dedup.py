@@ -0,0 +1,122 @@
+"""
+近似重复新闻聚类模块
+标题/摘要取字符 shingle 计算 MinHash 签名，LSH 分桶只比较同桶候选，近似线性时间内把同一事件的多源报道聚为一簇
+"""
+
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Set
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 2^31 - 1：哈希系数与 shingle 哈希都小于它，乘积不会溢出 uint64
+_PRIME = (1 << 31) - 1
+_SEED = 20240601
+
+
+def normalize_text(text: str) -> str:
+    """小写并去掉标点空白（与标题精确去重的规则一致）"""
+    return re.sub(r'[^\w\u4e00-\u9fff]', '', (text or '').lower())
+
+
+def shingles(text: str, size: int = 2) -> Set[str]:
+    """字符 shingle 集合；中文标题短，默认取 2-gram"""
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash 签名与 LSH 分桶键（默认 32 个 band × 2 行，Jaccard 0.4 的文本对几乎必然成为候选）"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, seed: int = _SEED):
+        if num_perm % bands:
+            raise ValueError(f"num_perm={num_perm} is not divisible by bands={bands}")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+
+    def signature(self, shingle_set: Set[str]) -> np.ndarray:
+        """num_perm 个哈希函数下各自的最小值（uint32）"""
+        if not shingle_set:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint32)
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) % _PRIME for s in shingle_set),
+            dtype=np.uint64, count=len(shingle_set)
+        )
+        values = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return values.min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        """每个 band 一个分桶键；任一 band 完全相同即为候选"""
+        return [
+            f"{band}:{signature[band * self.rows:(band + 1) * self.rows].tobytes().hex()}"
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """签名估计的 Jaccard 相似度"""
+        return float(np.mean(a == b))
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            # 保留较小下标为根，簇按首次出现的顺序排列
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def cluster_texts(texts: Sequence[str], threshold: float = 0.5,
+                  hasher: Optional[MinHasher] = None) -> List[List[int]]:
+    """把文本按近似重复聚簇，返回下标列表（簇内与簇间均保持输入顺序）
+
+    LSH 同桶的候选再用 shingle 集合的精确 Jaccard 复核，避免误合并。
+    """
+    hasher = hasher or MinHasher()
+    shingle_sets = [shingles(text) for text in texts]
+    union_find = _UnionFind(len(texts))
+    buckets: Dict[str, List[int]] = {}
+    compared = set()
+
+    for i, shingle_set in enumerate(shingle_sets):
+        if not shingle_set:
+            continue
+        for key in hasher.band_keys(hasher.signature(shingle_set)):
+            members = buckets.setdefault(key, [])
+            for j in members:
+                if (j, i) in compared:
+                    continue
+                compared.add((j, i))
+                if jaccard(shingle_sets[j], shingle_set) >= threshold:
+                    union_find.union(j, i)
+            members.append(i)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        clusters.setdefault(union_find.find(i), []).append(i)
+    logger.debug(f"Near-duplicate clustering: {len(texts)} texts, {len(compared)} candidate pairs")
+    return list(clusters.values())
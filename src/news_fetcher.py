@@ -8,15 +8,28 @@ import json
 import os
 import re
 import time
+import io
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from html import unescape
-from typing import Any, List, Dict, Optional
-from dataclasses import dataclass
-from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from dataclasses import asdict, dataclass, field, replace
 import logging
 
+from requests.adapters import HTTPAdapter
+
+from broadcast_history import BroadcastHistory
+from disk_cache import DiskCache
+from feed_parser import FeedEntry, iter_feed_entries
+from http_cache import CachedResponse, CachingSession
+from keyword_classifier import NewsClassifier
+from llm_client import get_llm_client
+from near_dedup import cluster_texts, normalize_text
+from source_health import SourceHealth
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -30,10 +43,31 @@ class NewsItem:
     url: str
     publish_time: str
     category: str = "general"
+    # 近似重复聚类后，同一事件的其他报道来源
+    corroborating_sources: List[str] = field(default_factory=list)
+
+
+# 解析逻辑变化时递增，使旧的解析结果缓存失效
+PARSED_CACHE_VERSION = 2
+
+# (源名称, 抓取函数, 优先级)
+NewsSource = Tuple[str, Callable[..., List[NewsItem]], int]
 
 
 class NewsFetcher:
     """新闻获取器"""
+
+    # 按来源优先级排序（可以根据需要调整），未列出的来源为 4
+    SOURCE_PRIORITY = {
+        '知乎热榜': 1,
+        '微博热搜': 1,
+        '百度热搜': 1,
+        'Google新闻': 2,
+        'Bing新闻': 2,
+        '科技日报': 2,
+        '财经网': 2,
+        '国际新闻': 2,
+    }
     
     def __init__(self):
         self.session = requests.Session()
@@ -43,37 +77,53 @@ class NewsFetcher:
         })
         self.news_api_key = os.getenv('NEWS_API_KEY', '')
         self.allow_mock_fallback = os.getenv('ALLOW_MOCK_NEWS_FALLBACK', 'false').lower() == 'true'
-        self.x666_base_url = os.getenv('X666_BASE_URL', 'https://grok.oo9.dpdns.org/v1').rstrip('/')
-        self.x666_api_key = os.getenv('X666_API_KEY') or os.getenv('OPENAI_API_KEY', '')
-        self.x666_model = os.getenv('X666_MODEL', 'grok-4-fast-expert')
         self.max_news_items = self._read_int_env('NEWS_MAX_ITEMS', default=12, minimum=4, maximum=30)
-        self._llm_request_timestamps = deque()
-        self._llm_rate_limit_window_seconds = 10.0
-        self._llm_rate_limit_max_requests = 10
-
-    def _throttle_llm_request(self):
-        """限制 LLM 请求速率，避免超过 10 req / 10s"""
-        now = time.monotonic()
-        while self._llm_request_timestamps and (
-            now - self._llm_request_timestamps[0] >= self._llm_rate_limit_window_seconds
-        ):
-            self._llm_request_timestamps.popleft()
-
-        if len(self._llm_request_timestamps) >= self._llm_rate_limit_max_requests:
-            sleep_seconds = self._llm_rate_limit_window_seconds - (
-                now - self._llm_request_timestamps[0]
-            ) + 0.05
-            if sleep_seconds > 0:
-                logger.info(f"LLM rate limit guard sleep: {sleep_seconds:.2f}s")
-                time.sleep(sleep_seconds)
-
-            now = time.monotonic()
-            while self._llm_request_timestamps and (
-                now - self._llm_request_timestamps[0] >= self._llm_rate_limit_window_seconds
-            ):
-                self._llm_request_timestamps.popleft()
-
-        self._llm_request_timestamps.append(time.monotonic())
+        # 各新闻源并发抓取，连接池需容纳同时进行的请求
+        self.fetch_workers = self._read_int_env('NEWS_FETCH_WORKERS', default=8, minimum=1, maximum=16)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.fetch_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # HTTP 条件请求缓存 + 解析结果缓存
+        news_cache_dir = os.path.join(os.getenv('CACHE_DIR', '.cache'), 'news')
+        http_cache = None
+        self.parsed_cache: Optional[DiskCache] = None
+        if os.getenv('NEWS_HTTP_CACHE', 'true').lower() == 'true':
+            max_mb = self._read_int_env('NEWS_HTTP_CACHE_MAX_MB', default=64, minimum=1, maximum=4096)
+            http_cache = DiskCache(os.path.join(news_cache_dir, 'http'), max_mb * 1024 * 1024, name='http')
+            self.parsed_cache = DiskCache(
+                os.path.join(news_cache_dir, 'parsed'), max_mb * 1024 * 1024, name='parsed'
+            )
+        self.http = CachingSession(
+            self.session, http_cache,
+            min_ttl=self._read_int_env('NEWS_HTTP_MIN_TTL_S', default=0, minimum=0, maximum=86400)
+        )
+        # 抓取总时限；各源超时按近期耗时自适应，连续失败的源熔断一段时间
+        self.fetch_budget = self._read_int_env('NEWS_FETCH_BUDGET_S', default=60, minimum=5, maximum=600)
+        self.source_health = SourceHealth(
+            os.getenv('NEWS_SOURCE_STATE', '').strip()
+            or os.path.join(news_cache_dir, 'sources.json'),
+            default_timeout=self._read_int_env('NEWS_SOURCE_TIMEOUT_S', default=30, minimum=3, maximum=120),
+            failure_threshold=self._read_int_env('NEWS_BREAKER_THRESHOLD', default=3, minimum=1, maximum=20),
+        )
+        # 近似重复判定阈值（字符 shingle 的 Jaccard 相似度，百分比）
+        self.dedup_similarity = self._read_int_env('NEWS_DEDUP_SIMILARITY', default=50, minimum=10, maximum=100)
+        # 跨天播报历史：窗口期内播过的新闻降权（demote）或剔除（drop）
+        self.history_mode = os.getenv('NEWS_HISTORY_MODE', 'demote').strip().lower()
+        self.broadcast_history: Optional[BroadcastHistory] = None
+        if self.history_mode in ('demote', 'drop'):
+            self.broadcast_history = BroadcastHistory(
+                os.getenv('NEWS_HISTORY_DB', '').strip()
+                or os.path.join(news_cache_dir, 'history.sqlite3'),
+                window_days=self._read_int_env('NEWS_HISTORY_DAYS', default=3, minimum=0, maximum=30),
+                retention_days=self._read_int_env('NEWS_HISTORY_RETENTION_DAYS', default=14, minimum=1, maximum=365),
+                threshold=self.dedup_similarity / 100,
+            )
+        elif self.history_mode != 'off':
+            logger.warning(f"Invalid NEWS_HISTORY_MODE={self.history_mode!r}, broadcast history disabled")
+        # 国内/国际分类关键词表（可用 JSON 配置扩展）
+        self.classifier = NewsClassifier.from_file(os.getenv('NEWS_KEYWORDS_PATH', '').strip())
+        # 文案优化模型（x666，OpenAI兼容接口；连接池与限流与断句共享）
+        self.llm_client = get_llm_client()
 
     def _read_int_env(self, key: str, default: int, minimum: int, maximum: int) -> int:
         """读取整数环境变量并做边界保护"""
@@ -133,44 +183,66 @@ class NewsFetcher:
         except Exception:
             return None
 
-    def _get_item_text(self, parent: ET.Element, tag_names: List[str]) -> str:
-        """从XML节点中提取文本"""
-        for tag in tag_names:
-            node = parent.find(tag)
-            if node is not None and node.text:
-                return node.text.strip()
-        return ''
+    def _parsed_cache_key(self, response: CachedResponse, parser_name: str) -> str:
+        return DiskCache.make_key({
+            'parser': parser_name,
+            'version': PARSED_CACHE_VERSION,
+            'digest': response.digest,
+        })
 
-    def _is_international_news(self, news: NewsItem) -> bool:
-        """粗粒度判断国际新闻"""
-        source = (news.source or '').lower()
-        text = f"{news.title} {news.summary}".lower()
+    def _load_parsed(self, key: str) -> Optional[Tuple[List[NewsItem], bool]]:
+        """读取缓存的解析结果，返回 (条目, 是否解析到文档末尾)"""
+        meta = self.parsed_cache.get(key) if self.parsed_cache else None
+        if not meta:
+            return None
+        try:
+            with open(self.parsed_cache.path(key, 'items.json'), 'r', encoding='utf-8') as f:
+                return [NewsItem(**item) for item in json.load(f)], meta.get('complete', True)
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f"Parsed cache entry unreadable for {meta.get('parser')}: {e}")
+            return None
 
-        international_sources = [
-            'reuters', 'ap', 'associated press', 'bbc', 'cnn', 'bloomberg',
-            'financial times', 'the guardian', 'nyt', 'new york times',
-            '华尔街', '路透', '彭博', '法新社', '联合早报', 'bbc', 'cnn'
-        ]
-        if any(keyword in source for keyword in international_sources):
-            return True
+    def _store_parsed(self, key: str, parser_name: str, news_items: List[NewsItem],
+                      complete: bool = True):
+        if not self.parsed_cache:
+            return
+        self.parsed_cache.put(
+            key, {'parser': parser_name, 'count': len(news_items), 'complete': complete},
+            blobs={'items.json': json.dumps([asdict(news) for news in news_items],
+                                            ensure_ascii=False).encode('utf-8')}
+        )
 
-        international_keywords = [
-            '美国', '日本', '欧洲', '欧盟', '英国', '法国', '德国', '俄罗斯', '乌克兰',
-            '中东', '以色列', '巴勒斯坦', '联合国', '北约', '国际', 'global', 'world'
-        ]
-        domestic_keywords = ['中国', '国内', '国务院', '发改委', '央行', '上海', '北京', '深圳', '广州']
+    def _parse_cached(self, response: CachedResponse, parser_name: str,
+                      parse: Callable[[], List[NewsItem]]) -> List[NewsItem]:
+        """按 (解析器, 响应体摘要) 缓存解析结果：内容未变（含 304）时不再重复解析"""
+        if not self.parsed_cache:
+            return parse()
 
-        if any(k in text for k in domestic_keywords):
-            return False
-        if any(k in text for k in international_keywords):
-            return True
+        key = self._parsed_cache_key(response, parser_name)
+        cached = self._load_parsed(key)
+        if cached:
+            return cached[0]
+
+        news_items = parse()
+        self._store_parsed(key, parser_name, news_items)
+        return news_items
+
+    def _stamp_now(self, news_items: List[NewsItem]) -> List[NewsItem]:
+        """热榜没有发布时间，以抓取时间为准"""
+        now = self._beijing_now().isoformat()
+        for news in news_items:
+            news.publish_time = now
+        return news_items
 
-        return False
+    def _is_international_news(self, news: NewsItem) -> bool:
+        """粗粒度判断国际新闻"""
+        return self.classifier.is_international(news.source, news.title, news.summary)
 
     def _build_local_script(self, news_items: List[NewsItem], date_str: str, weekday_str: str) -> Dict:
         """本地兜底脚本生成（无AI）"""
-        domestic = [n for n in news_items if not self._is_international_news(n)]
-        international = [n for n in news_items if self._is_international_news(n)]
+        is_international = [self._is_international_news(n) for n in news_items]
+        domestic = [n for n, flag in zip(news_items, is_international) if not flag]
+        international = [n for n, flag in zip(news_items, is_international) if flag]
 
         # 保证两组都尽量有内容
         if not domestic and international:
@@ -224,13 +296,9 @@ class NewsFetcher:
             'full_script': " ".join(full_script_parts)
         }
 
-    def _strip_json_fence(self, text: str) -> str:
-        match = re.search(r'```(?:json)?\s*(.*?)\s*```', text, re.S)
-        return match.group(1).strip() if match else text.strip()
-
     def _call_ai_script_optimizer(self, news_items: List[NewsItem], date_str: str, weekday_str: str) -> Optional[Dict]:
         """一次AI请求生成完整脚本（去重、分组、润色）"""
-        if not self.x666_api_key:
+        if not self.llm_client.enabled:
             return None
 
         target_count = max(1, min(len(news_items), self.max_news_items))
@@ -267,37 +335,13 @@ class NewsFetcher:
             'news_items': items_payload
         }, ensure_ascii=False)
 
-        payload = {
-            'model': self.x666_model,
-            'temperature': 0.2,
-            'messages': [
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_prompt},
-            ]
-        }
-        headers = {
-            'Authorization': f'Bearer {self.x666_api_key}',
-            'Content-Type': 'application/json',
-        }
+        messages = [
+            {'role': 'system', 'content': system_prompt},
+            {'role': 'user', 'content': user_prompt},
+        ]
 
         try:
-            self._throttle_llm_request()
-            response = requests.post(
-                f"{self.x666_base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=45
-            )
-            response.raise_for_status()
-            data = response.json()
-            content = (
-                data.get('choices', [{}])[0]
-                .get('message', {})
-                .get('content', '')
-            )
-            if not content:
-                return None
-            parsed = json.loads(self._strip_json_fence(content))
+            parsed = self.llm_client.chat_json(messages, temperature=0.2, timeout=45)
             if not isinstance(parsed, dict):
                 return None
 
@@ -401,113 +445,98 @@ class NewsFetcher:
             logger.warning(f"AI script optimization failed, fallback to local: {e}")
             return None
 
+    def _news_from_entry(self, entry: FeedEntry, source: str, category: str) -> NewsItem:
+        """RSS/Atom 条目转为 NewsItem（缺失发布时间时留空）"""
+        publish_dt = self._parse_publish_time(entry.published)
+        return NewsItem(
+            title=self._strip_html(entry.title)[:120],
+            summary=self._strip_html(entry.summary)[:220],
+            source=source,
+            url=entry.link,
+            publish_time=publish_dt.isoformat() if publish_dt else '',
+            category=category
+        )
+
+    def _recent_copy(self, news: NewsItem, now_utc: datetime,
+                     recency_hours: int) -> Optional[NewsItem]:
+        """时效过滤：过期返回 None；缺失发布时间按当前时间计（返回副本，不改动缓存条目）"""
+        publish_dt = self._parse_publish_time(news.publish_time) or now_utc
+        if (now_utc - publish_dt) > timedelta(hours=recency_hours):
+            return None
+        return replace(news, publish_time=publish_dt.isoformat())
+
     def fetch_from_rss(self, url: str, source: str, category: str = 'general',
-                       limit: int = 15, recency_hours: int = 36) -> List[NewsItem]:
-        """通用RSS新闻抓取"""
+                       limit: int = 15, recency_hours: int = 36, timeout: float = 30) -> List[NewsItem]:
+        """通用RSS新闻抓取（流式解析，取够 limit 条时效内条目即停止）"""
         try:
-            response = self.session.get(url, timeout=30)
+            response = self.http.get(url, timeout=timeout)
             response.raise_for_status()
-            root = ET.fromstring(response.content)
-
             now_utc = datetime.now(timezone.utc)
-            news_items = []
-
-            # RSS item
-            for item in root.findall('.//item'):
-                title = self._get_item_text(item, ['title'])
-                if not title:
-                    continue
-
-                summary = self._get_item_text(
-                    item,
-                    ['description', '{http://purl.org/rss/1.0/modules/content/}encoded']
-                )
-                link = self._get_item_text(item, ['link'])
-                raw_pub = self._get_item_text(item, ['pubDate', 'published', 'updated'])
-                publish_dt = self._parse_publish_time(raw_pub) or now_utc
-
-                if (now_utc - publish_dt) > timedelta(hours=recency_hours):
-                    continue
-
-                news_items.append(NewsItem(
-                    title=self._strip_html(title)[:120],
-                    summary=self._strip_html(summary)[:220],
-                    source=source,
-                    url=link,
-                    publish_time=publish_dt.isoformat(),
-                    category=category
-                ))
-
-                if len(news_items) >= limit:
-                    break
-
-            # Atom entry（部分站点）
-            if not news_items:
-                atom_ns = {'atom': 'http://www.w3.org/2005/Atom'}
-                entries = root.findall('.//atom:entry', atom_ns) or root.findall('.//entry')
+            parser_name = f'rss:{source}:{category}'
+            cache_key = self._parsed_cache_key(response, parser_name)
+
+            # 缓存的条目足够，或上次已解析完整个文档，则无需再解析
+            cached = self._load_parsed(cache_key)
+            if cached:
+                parsed, complete = cached
+                news_items = [
+                    recent for recent in (self._recent_copy(n, now_utc, recency_hours) for n in parsed)
+                    if recent
+                ][:limit]
+                if complete or len(news_items) >= limit:
+                    logger.info(f"Fetched {len(news_items)} items from RSS ({source}, cached parse)")
+                    return news_items
+
+            parsed, news_items = [], []
+            complete = True
+            entries = iter_feed_entries(io.BytesIO(response.content))
+            try:
                 for entry in entries:
-                    title = self._get_item_text(entry, ['{http://www.w3.org/2005/Atom}title', 'title'])
-                    if not title:
-                        continue
-
-                    summary = self._get_item_text(
-                        entry,
-                        ['{http://www.w3.org/2005/Atom}summary',
-                         '{http://www.w3.org/2005/Atom}content',
-                         'summary', 'content']
-                    )
-
-                    link = ''
-                    link_node = entry.find('{http://www.w3.org/2005/Atom}link') or entry.find('link')
-                    if link_node is not None:
-                        link = (link_node.attrib.get('href') or link_node.text or '').strip()
-
-                    raw_pub = self._get_item_text(
-                        entry,
-                        ['{http://www.w3.org/2005/Atom}published',
-                         '{http://www.w3.org/2005/Atom}updated',
-                         'published', 'updated']
-                    )
-                    publish_dt = self._parse_publish_time(raw_pub) or now_utc
-
-                    if (now_utc - publish_dt) > timedelta(hours=recency_hours):
-                        continue
-
-                    news_items.append(NewsItem(
-                        title=self._strip_html(title)[:120],
-                        summary=self._strip_html(summary)[:220],
-                        source=source,
-                        url=link,
-                        publish_time=publish_dt.isoformat(),
-                        category=category
-                    ))
-
+                    news = self._news_from_entry(entry, source, category)
+                    parsed.append(news)
+                    recent = self._recent_copy(news, now_utc, recency_hours)
+                    if recent:
+                        news_items.append(recent)
                     if len(news_items) >= limit:
+                        complete = False
                         break
-
+            except ET.ParseError as e:
+                # 文档中途损坏时保留已解析的条目，但不写入缓存
+                if not news_items:
+                    raise
+                logger.warning(f"RSS from {source} is malformed after {len(parsed)} entries: {e}")
+                parsed = None
+            finally:
+                entries.close()
+
+            if parsed is not None:
+                self._store_parsed(cache_key, parser_name, parsed, complete=complete)
             logger.info(f"Fetched {len(news_items)} items from RSS ({source})")
             return news_items
         except Exception as e:
             logger.error(f"Error fetching RSS from {source}: {e}")
             return []
 
-    def fetch_from_google_news_rss(self) -> List[NewsItem]:
+    def fetch_from_google_news_rss(self, timeout: float = 30) -> List[NewsItem]:
         """Google News 中文RSS"""
         url = 'https://news.google.com/rss?hl=zh-CN&gl=CN&ceid=CN:zh-Hans'
-        return self.fetch_from_rss(url, source='Google新闻', category='hot', limit=20, recency_hours=36)
+        return self.fetch_from_rss(url, source='Google新闻', category='hot', limit=20,
+                                   recency_hours=36, timeout=timeout)
 
-    def fetch_from_bing_news_rss(self, query: str) -> List[NewsItem]:
+    def fetch_from_bing_news_rss(self, query: str, timeout: float = 30) -> List[NewsItem]:
         """Bing News RSS"""
         url = 'https://www.bing.com/news/search'
         params = {'q': query, 'format': 'rss'}
         try:
             query_url = requests.Request('GET', url, params=params).prepare().url
-            return self.fetch_from_rss(query_url, source='Bing新闻', category='hot', limit=15, recency_hours=36)
+            return self.fetch_from_rss(query_url, source='Bing新闻', category='hot', limit=15,
+                                       recency_hours=36, timeout=timeout)
         except Exception as e:
             logger.error(f"Error preparing Bing RSS URL: {e}")
             return []
     
-    def fetch_from_newsapi(self, category: str = 'general', page_size: int = 10) -> List[NewsItem]:
+    def fetch_from_newsapi(self, category: str = 'general', page_size: int = 10,
+                           timeout: float = 30) -> List[NewsItem]:
         """从 NewsAPI 获取新闻"""
         if not self.news_api_key:
             logger.warning("NewsAPI key not configured, skipping")
@@ -522,21 +551,24 @@ class NewsFetcher:
         }
         
         try:
-            response = self.session.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=timeout)
             response.raise_for_status()
-            data = response.json()
-            
-            news_items = []
-            for article in data.get('articles', []):
-                news = NewsItem(
-                    title=article.get('title', ''),
-                    summary=article.get('description', '') or article.get('content', '')[:200],
-                    source=article.get('source', {}).get('name', 'Unknown'),
-                    url=article.get('url', ''),
-                    publish_time=article.get('publishedAt', ''),
-                    category=category
-                )
-                news_items.append(news)
+
+            def parse() -> List[NewsItem]:
+                news_items = []
+                for article in response.json().get('articles', []):
+                    news = NewsItem(
+                        title=article.get('title', ''),
+                        summary=article.get('description', '') or article.get('content', '')[:200],
+                        source=article.get('source', {}).get('name', 'Unknown'),
+                        url=article.get('url', ''),
+                        publish_time=article.get('publishedAt', ''),
+                        category=category
+                    )
+                    news_items.append(news)
+                return news_items
+
+            news_items = self._parse_cached(response, f'newsapi:{category}', parse)
             
             logger.info(f"Fetched {len(news_items)} news from NewsAPI ({category})")
             return news_items
@@ -545,27 +577,30 @@ class NewsFetcher:
             logger.error(f"Error fetching from NewsAPI: {e}")
             return []
     
-    def fetch_from_zhihu_hot(self) -> List[NewsItem]:
+    def fetch_from_zhihu_hot(self, timeout: float = 30) -> List[NewsItem]:
         """从知乎热榜获取热门话题"""
         url = 'https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total'
         
         try:
-            response = self.session.get(url, timeout=30)
+            response = self.http.get(url, timeout=timeout)
             response.raise_for_status()
-            data = response.json()
-            
-            news_items = []
-            for item in data.get('data', [])[:15]:
-                target = item.get('target', {})
-                news = NewsItem(
-                    title=target.get('title', ''),
-                    summary=target.get('excerpt', '')[:200],
-                    source='知乎热榜',
-                    url=target.get('link', {}).get('url', ''),
-                    publish_time=self._beijing_now().isoformat(),
-                    category='hot'
-                )
-                news_items.append(news)
+
+            def parse() -> List[NewsItem]:
+                news_items = []
+                for item in response.json().get('data', [])[:15]:
+                    target = item.get('target', {})
+                    news = NewsItem(
+                        title=target.get('title', ''),
+                        summary=target.get('excerpt', '')[:200],
+                        source='知乎热榜',
+                        url=target.get('link', {}).get('url', ''),
+                        publish_time='',
+                        category='hot'
+                    )
+                    news_items.append(news)
+                return news_items
+
+            news_items = self._stamp_now(self._parse_cached(response, 'zhihu', parse))
             
             logger.info(f"Fetched {len(news_items)} hot topics from Zhihu")
             return news_items
@@ -574,26 +609,29 @@ class NewsFetcher:
             logger.error(f"Error fetching from Zhihu: {e}")
             return []
     
-    def fetch_from_weibo_hot(self) -> List[NewsItem]:
+    def fetch_from_weibo_hot(self, timeout: float = 30) -> List[NewsItem]:
         """从微博热搜获取热门话题"""
         url = 'https://weibo.com/ajax/side/hotSearch'
         
         try:
-            response = self.session.get(url, timeout=30)
+            response = self.http.get(url, timeout=timeout)
             response.raise_for_status()
-            data = response.json()
-            
-            news_items = []
-            for item in data.get('data', {}).get('realtime', [])[:15]:
-                news = NewsItem(
-                    title=item.get('note', ''),
-                    summary=item.get('word', ''),
-                    source='微博热搜',
-                    url=f"https://s.weibo.com/weibo?q={item.get('word', '')}",
-                    publish_time=self._beijing_now().isoformat(),
-                    category='hot'
-                )
-                news_items.append(news)
+
+            def parse() -> List[NewsItem]:
+                news_items = []
+                for item in response.json().get('data', {}).get('realtime', [])[:15]:
+                    news = NewsItem(
+                        title=item.get('note', ''),
+                        summary=item.get('word', ''),
+                        source='微博热搜',
+                        url=f"https://s.weibo.com/weibo?q={item.get('word', '')}",
+                        publish_time='',
+                        category='hot'
+                    )
+                    news_items.append(news)
+                return news_items
+
+            news_items = self._stamp_now(self._parse_cached(response, 'weibo', parse))
             
             logger.info(f"Fetched {len(news_items)} hot topics from Weibo")
             return news_items
@@ -602,7 +640,7 @@ class NewsFetcher:
             logger.error(f"Error fetching from Weibo: {e}")
             return []
     
-    def fetch_from_baidu_hot(self) -> List[NewsItem]:
+    def fetch_from_baidu_hot(self, timeout: float = 30) -> List[NewsItem]:
         """从百度热搜获取热门话题"""
         url = 'https://top.baidu.com/api/board'
         params = {
@@ -611,43 +649,45 @@ class NewsFetcher:
         }
         
         try:
-            response = self.session.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=timeout)
             response.raise_for_status()
-            data = response.json()
-            
-            news_items = []
-            cards = data.get('data', {}).get('cards', [])
-            contents = []
 
-            for card in cards:
-                if not isinstance(card, dict):
-                    continue
-                for key in ['content', 'list', 'data']:
-                    value = card.get(key)
-                    if isinstance(value, list):
-                        contents.extend(value)
+            def parse() -> List[NewsItem]:
+                news_items = []
+                cards = response.json().get('data', {}).get('cards', [])
+                contents = []
 
-            for item in contents[:30]:
-                if not isinstance(item, dict):
-                    continue
+                for card in cards:
+                    if not isinstance(card, dict):
+                        continue
+                    for key in ['content', 'list', 'data']:
+                        value = card.get(key)
+                        if isinstance(value, list):
+                            contents.extend(value)
 
-                title = (item.get('word') or item.get('title') or item.get('query') or '').strip()
-                if not title:
-                    continue
+                for item in contents[:30]:
+                    if not isinstance(item, dict):
+                        continue
 
-                summary = item.get('desc') or item.get('hotScore') or item.get('hotDesc') or ''
-                summary = str(summary).strip()[:220]
-                publish_time = self._beijing_now().isoformat()
-
-                news = NewsItem(
-                    title=title,
-                    summary=summary,
-                    source='百度热搜',
-                    url=item.get('url', '') or item.get('link', ''),
-                    publish_time=publish_time,
-                    category='hot'
-                )
-                news_items.append(news)
+                    title = (item.get('word') or item.get('title') or item.get('query') or '').strip()
+                    if not title:
+                        continue
+
+                    summary = item.get('desc') or item.get('hotScore') or item.get('hotDesc') or ''
+                    summary = str(summary).strip()[:220]
+
+                    news = NewsItem(
+                        title=title,
+                        summary=summary,
+                        source='百度热搜',
+                        url=item.get('url', '') or item.get('link', ''),
+                        publish_time='',
+                        category='hot'
+                    )
+                    news_items.append(news)
+                return news_items
+
+            news_items = self._stamp_now(self._parse_cached(response, 'baidu', parse))
             
             logger.info(f"Fetched {len(news_items)} hot topics from Baidu")
             return news_items
@@ -703,45 +743,60 @@ class NewsFetcher:
         logger.info(f"Using {len(mock_news)} mock news items")
         return mock_news
     
+    def _title_key(self, news: NewsItem) -> str:
+        """清理标题用于去重比较"""
+        return normalize_text(news.title or news.summary or '')
+
+    def _rank_key(self, news: NewsItem) -> Tuple[int, float]:
+        """来源优先级高、发布时间新的排在前面"""
+        publish_dt = self._parse_publish_time(news.publish_time)
+        timestamp = publish_dt.timestamp() if publish_dt else 0
+        return (self.SOURCE_PRIORITY.get(news.source, 4), -timestamp)
+
     def filter_and_rank_news(self, news_items: List[NewsItem], max_items: Optional[int] = None) -> List[NewsItem]:
         """过滤和排序新闻，选择最重要的内容"""
         limit = max_items if isinstance(max_items, int) and max_items > 0 else self.max_news_items
 
-        # 去重：基于标题相似度
+        # 去重：同一事件的多源报道按近似重复聚簇，每簇保留排序最靠前的一条并记录其他来源
+        candidates = [news for news in news_items if self._title_key(news)]
+        clusters = cluster_texts(
+            [news.title or news.summary for news in candidates],
+            threshold=self.dedup_similarity / 100,
+        )
         unique_news = []
-        seen_titles = set()
-        
-        for news in news_items:
-            # 清理标题用于比较
-            base_text = (news.title or news.summary or '').lower()
-            clean_title = re.sub(r'[^\w\u4e00-\u9fff]', '', base_text)
-            if not clean_title:
-                continue
-            if clean_title not in seen_titles:
-                seen_titles.add(clean_title)
-                unique_news.append(news)
-        
-        # 按来源优先级排序（可以根据需要调整）
-        source_priority = {
-            '知乎热榜': 1,
-            '微博热搜': 1,
-            '百度热搜': 1,
-            'Google新闻': 2,
-            'Bing新闻': 2,
-            '科技日报': 2,
-            '财经网': 2,
-            '国际新闻': 2,
-        }
-
-        def sort_key(news: NewsItem):
-            publish_dt = self._parse_publish_time(news.publish_time)
-            timestamp = publish_dt.timestamp() if publish_dt else 0
-            return (source_priority.get(news.source, 4), -timestamp)
+        for cluster in clusters:
+            members = [candidates[i] for i in cluster]
+            best = min(members, key=self._rank_key)
+            others = []
+            for news in members:
+                if news.source != best.source and news.source not in others:
+                    others.append(news.source)
+            unique_news.append(replace(best, corroborating_sources=others))
+        if len(unique_news) < len(candidates):
+            logger.info(f"Merged {len(candidates)} items into {len(unique_news)} stories")
+
+        # 近几天已播过的新闻：drop 模式剔除，demote 模式排到所有新内容之后
+        aired: Dict[int, str] = {}
+        if self.broadcast_history:
+            aired = self.broadcast_history.find_aired(
+                [news.title or news.summary for news in unique_news], self._beijing_now().date()
+            )
+            if aired:
+                action = 'dropped' if self.history_mode == 'drop' else 'demoted'
+                logger.info(f"{len(aired)} stories already aired in the last "
+                            f"{self.broadcast_history.window_days} days, {action}")
+        repeated = {id(unique_news[i]) for i in aired}
+        if self.history_mode == 'drop':
+            unique_news = [news for news in unique_news if id(news) not in repeated]
+
+        # 同优先级内，多源印证的事件排在前面
+        unique_news.sort(key=lambda news: (
+            id(news) in repeated,
+            self._rank_key(news)[0], -len(news.corroborating_sources), self._rank_key(news)[1]
+        ))
 
-        unique_news.sort(key=sort_key)
-        
         return unique_news[:limit]
-    
+
     def generate_news_script(self, news_items: List[NewsItem]) -> Dict:
         """生成新闻播报脚本"""
         today = self._beijing_now()
@@ -753,32 +808,129 @@ class NewsFetcher:
             return ai_script
         return self._build_local_script(news_items, date_str, weekday_str)
     
+    def _news_sources(self) -> List[NewsSource]:
+        """实时新闻源列表 (名称, 抓取函数, 优先级)，顺序即合并顺序（保证排序结果稳定）
+
+        抓取函数接受 `timeout` 关键字参数。
+        """
+        sources = [
+            ('zhihu', self.fetch_from_zhihu_hot, 1),
+            ('weibo', self.fetch_from_weibo_hot, 1),
+            ('baidu', self.fetch_from_baidu_hot, 1),
+            ('google', self.fetch_from_google_news_rss, 2),
+            ('bing_cn', partial(self.fetch_from_bing_news_rss, '中国 热点'), 2),
+            ('bing_world', partial(self.fetch_from_bing_news_rss, '国际 科技'), 2),
+        ]
+        # 如果有NewsAPI key，也尝试获取
+        if self.news_api_key:
+            for category in ('general', 'technology', 'business'):
+                sources.append((f'newsapi_{category}', partial(self.fetch_from_newsapi, category), 4))
+        return sources
+
+    @staticmethod
+    def _timed_fetch(fetch: Callable[..., List[NewsItem]], timeout: float) -> Tuple[List[NewsItem], float]:
+        start = time.monotonic()
+        items = fetch(timeout=timeout)
+        return items, time.monotonic() - start
+
+    def _has_enough_items(self, results: Dict[str, List[NewsItem]], pending_priority: int) -> bool:
+        """已取得的、优先级不低于剩余各源的去重条目是否足够填满 max_news_items"""
+        keys = set()
+        for items in results.values():
+            for news in items:
+                if self.SOURCE_PRIORITY.get(news.source, 4) <= pending_priority:
+                    key = self._title_key(news)
+                    if key:
+                        keys.add(key)
+        return len(keys) >= self.max_news_items
+
+    def fetch_from_sources(self, sources: List[NewsSource]) -> List[NewsItem]:
+        """并发抓取各新闻源，按源列表顺序合并结果
+
+        总时限 `fetch_budget` 内未返回的源直接放弃；已熔断的源跳过；
+        高优先级条目已足够时不再等待较慢的源。
+        """
+        if not sources:
+            return []
+
+        start = time.monotonic()
+        deadline = start + self.fetch_budget
+        active = [source for source in sources if not self.source_health.is_open(source[0])]
+        if len(active) < len(sources):
+            skipped = [source[0] for source in sources if source not in active]
+            logger.warning(f"Circuit open, skipping sources: {', '.join(skipped)}")
+
+        results: Dict[str, List[NewsItem]] = {}
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.fetch_workers, len(active))))
+        futures = {}
+        for name, fetch, priority in active:
+            timeout = min(self.source_health.timeout_for(name), self.fetch_budget)
+            futures[pool.submit(self._timed_fetch, fetch, timeout)] = (name, priority)
+
+        pending = set(futures)
+        early = False
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, _ = futures[future]
+                    try:
+                        items, latency = future.result()
+                    except Exception as e:
+                        logger.error(f"Error fetching from {name}: {e}")
+                        items, latency = [], 0.0
+                    results[name] = items
+                    if items:
+                        self.source_health.record_success(name, latency)
+                    else:
+                        self.source_health.record_failure(name)
+
+                if pending and self._has_enough_items(
+                    results, min(futures[future][1] for future in pending)
+                ):
+                    early = True
+                    break
+
+            if pending:
+                names = ', '.join(futures[future][0] for future in pending)
+                if early:
+                    logger.info(f"Enough high-priority news fetched, not waiting for: {names}")
+                else:
+                    logger.warning(f"Fetch budget {self.fetch_budget}s exhausted, giving up on: {names}")
+                    for future in pending:
+                        self.source_health.record_failure(futures[future][0])
+        finally:
+            # 不等待被放弃的源，其请求超时不超过总时限
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.source_health.save()
+
+        merged = []
+        for name, _, _ in sources:
+            merged.extend(results.get(name, []))
+        logger.info(
+            f"Fetched {len(merged)} items from {len(results)}/{len(sources)} sources "
+            f"in {time.monotonic() - start:.1f}s"
+        )
+        logger.info(self.http.summary())
+        return merged
+
     def fetch_all_news(self, use_mock: bool = False) -> Dict:
         """获取所有新闻并生成脚本"""
         if use_mock:
             all_news = self.fetch_mock_news()
         else:
-            all_news = []
-            
-            # 尝试从各个源获取新闻
-            all_news.extend(self.fetch_from_zhihu_hot())
-            all_news.extend(self.fetch_from_weibo_hot())
-            all_news.extend(self.fetch_from_baidu_hot())
-            all_news.extend(self.fetch_from_google_news_rss())
-            all_news.extend(self.fetch_from_bing_news_rss('中国 热点'))
-            all_news.extend(self.fetch_from_bing_news_rss('国际 科技'))
-            
-            # 如果有NewsAPI key，也尝试获取
-            if self.news_api_key:
-                all_news.extend(self.fetch_from_newsapi('general'))
-                all_news.extend(self.fetch_from_newsapi('technology'))
-                all_news.extend(self.fetch_from_newsapi('business'))
+            # 尝试从各个源并发获取新闻
+            all_news = self.fetch_from_sources(self._news_sources())
             
             # 没有真实新闻时，默认不再静默回退mock，除非显式开启
             if not all_news:
                 if self.allow_mock_fallback:
                     logger.warning("No real-time news fetched, fallback to mock data")
                     all_news = self.fetch_mock_news()
+                    use_mock = True
                 else:
                     raise RuntimeError(
                         "No real-time news fetched from available sources. "
@@ -793,6 +945,7 @@ class NewsFetcher:
             if self.allow_mock_fallback:
                 logger.warning("No valid real-time news selected, fallback to mock data")
                 selected_news = self.fetch_mock_news()
+                use_mock = True
             else:
                 raise RuntimeError(
                     "No valid real-time news selected after filtering. "
@@ -801,6 +954,13 @@ class NewsFetcher:
         
         # 生成脚本
         script = self.generate_news_script(selected_news)
+        # 只记录真实新闻
+        if self.broadcast_history and not use_mock:
+            self.broadcast_history.record(
+                [news.title or news.summary for news in selected_news], self._beijing_now().date()
+            )
+        logger.info(self.llm_client.summary())
+        logger.info(self.llm_client.rate_limiter.summary())
         
         return {
             'script': script,
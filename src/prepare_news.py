@@ -8,6 +8,7 @@ from pathlib import Path
 from dataclasses import asdict, is_dataclass
 
 from news_fetcher import NewsFetcher
+from subtitle_splitter import SubtitleSplitter, script_subtitle_texts
 
 def to_jsonable_items(items):
     normalized = []
@@ -34,14 +35,19 @@ def main():
 
     script_path = out_dir / "script.json"
     news_items_path = out_dir / "news_items.json"
+    subtitles_path = out_dir / "subtitles.json"
 
     with open(script_path, "w", encoding="utf-8") as f:
         json.dump(script, f, ensure_ascii=False, indent=2)
     with open(news_items_path, "w", encoding="utf-8") as f:
         json.dump(news_items, f, ensure_ascii=False, indent=2)
 
+    # 字幕断句只在这里请求一次模型，各 voice 任务直接复用
+    SubtitleSplitter().dump(str(subtitles_path), script_subtitle_texts(script, news_items))
+
     print(f"prepared script: {script_path}")
     print(f"prepared news_items: {news_items_path}")
+    print(f"prepared subtitles: {subtitles_path}")
     print(f"total_selected: {result.get('total_selected', len(news_items))}")
 
 
@@ -0,0 +1,172 @@
+"""
+LLM 请求限流模块
+令牌桶状态保存在 SQLite 中，同一台机器上的多个进程（并行的生成任务）共享同一份额度
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS buckets ('
+    'name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+)
+
+
+class RateLimiter:
+    """跨进程令牌桶（SQLite 不可用时退化为进程内）
+
+    桶容量为 `max_requests` 的一半，其余额度匀速补充，保证任意 `window_seconds`
+    窗口内的请求数不超过 `max_requests`。
+    """
+
+    def __init__(self, state_dir: str, name: str = 'llm', max_requests: int = 10,
+                 window_seconds: float = 10.0):
+        self.name = name
+        max_requests = max(1, max_requests)
+        self.capacity = float(max(1, max_requests // 2))
+        self.refill_rate = max(max_requests - self.capacity, 1.0) / max(window_seconds, 0.001)
+        self.db_path = os.path.join(state_dir, 'rate_limit.sqlite3')
+
+        # 等待指标
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+        self._lock = threading.Lock()
+        self._local_state: Optional[Tuple[float, float]] = None
+        self._use_sqlite = True
+        try:
+            os.makedirs(state_dir, exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute(_SCHEMA)
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Rate limiter state unavailable ({e}), falling back to in-process limiting")
+            self._use_sqlite = False
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        return min(self.capacity, tokens + max(0.0, now - updated) * self.refill_rate)
+
+    def _take(self, tokens: float, updated: float, now: float) -> Tuple[float, float]:
+        """扣除一个令牌，返回 (剩余令牌, 需等待秒数)；令牌不足时不扣除"""
+        tokens = self._refill(tokens, updated, now)
+        if tokens >= 1.0:
+            return tokens - 1.0, 0.0
+        return tokens, (1.0 - tokens) / self.refill_rate
+
+    def _try_acquire_sqlite(self) -> float:
+        now = time.time()
+        conn = self._connect()
+        try:
+            # IMMEDIATE 事务对整个库加写锁，多个进程串行读改写
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT tokens, updated FROM buckets WHERE name = ?', (self.name,)
+            ).fetchone()
+            tokens, updated = row if row else (self.capacity, now)
+            tokens, wait = self._take(tokens, updated, now)
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)',
+                (self.name, tokens, now)
+            )
+            conn.execute('COMMIT')
+            return wait
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _try_acquire_local(self) -> float:
+        now = time.time()
+        tokens, updated = self._local_state or (self.capacity, now)
+        tokens, wait = self._take(tokens, updated, now)
+        self._local_state = (tokens, now)
+        return wait
+
+    def _try_acquire(self) -> float:
+        """尝试取一个令牌：成功返回 0，否则返回建议等待秒数"""
+        with self._lock:
+            if self._use_sqlite:
+                try:
+                    return self._try_acquire_sqlite()
+                except sqlite3.Error as e:
+                    logger.warning(f"Rate limiter database error ({e}), falling back to in-process limiting")
+                    self._use_sqlite = False
+            return self._try_acquire_local()
+
+    def _record(self, waited: float):
+        with self._lock:
+            self.acquired += 1
+            if waited > 0:
+                self.waited += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+        if waited > 0:
+            logger.info(f"LLM rate limit guard waited {waited:.2f}s")
+
+    def acquire(self) -> float:
+        """阻塞直到取得令牌，返回等待时长（秒）"""
+        start = time.monotonic()
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                break
+            time.sleep(wait + 0.01)
+        waited = time.monotonic() - start
+        self._record(waited if waited > 0.01 else 0.0)
+        return waited
+
+    async def acquire_async(self) -> float:
+        """异步版本：等待期间不阻塞事件循环"""
+        start = time.monotonic()
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait + 0.01)
+        waited = time.monotonic() - start
+        self._record(waited if waited > 0.01 else 0.0)
+        return waited
+
+    def summary(self) -> str:
+        return (
+            f"{self.name} rate limiter: {self.acquired} requests, {self.waited} waited, "
+            f"total wait {self.total_wait:.2f}s, max wait {self.max_wait:.2f}s"
+        )
+
+
+_llm_limiter: Optional[RateLimiter] = None
+_llm_limiter_lock = threading.Lock()
+
+
+def get_llm_rate_limiter() -> RateLimiter:
+    """进程级共享的 LLM 限流器；状态目录相同的进程共享额度"""
+    global _llm_limiter
+    with _llm_limiter_lock:
+        if _llm_limiter is None:
+            state_dir = os.getenv('LLM_RATE_LIMIT_DIR', '').strip() or os.path.join(
+                tempfile.gettempdir(), 'daily-news-video'
+            )
+            _llm_limiter = RateLimiter(
+                state_dir,
+                name='llm',
+                max_requests=int(os.getenv('LLM_RATE_LIMIT_REQUESTS', '10') or 10),
+                window_seconds=float(os.getenv('LLM_RATE_LIMIT_WINDOW', '10') or 10),
+            )
+        return _llm_limiter
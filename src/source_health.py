@@ -0,0 +1,90 @@
+"""
+新闻源健康状态模块
+记录各源最近的耗时与连续失败次数（持久化到 JSON），据此给出自适应超时并在连续失败后熔断
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_HISTORY = 10
+MIN_TIMEOUT = 3.0
+# 超时 = 近期耗时 P90 的倍数
+TIMEOUT_FACTOR = 2.5
+MAX_COOLDOWN = 24 * 3600.0
+
+
+class SourceHealth:
+    """按源名记录耗时与失败，提供自适应超时和熔断判断"""
+
+    def __init__(self, path: str, default_timeout: float = 30.0, failure_threshold: int = 3,
+                 cooldown_seconds: float = 3600.0):
+        self.path = path
+        self.default_timeout = default_timeout
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """原子写入状态文件"""
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with self._lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save source health to {self.path}: {e}")
+
+    def _entry(self, name: str) -> Dict:
+        return self._state.setdefault(name, {'latencies': [], 'failures': 0, 'open_until': 0.0})
+
+    def timeout_for(self, name: str) -> float:
+        """按近期耗时给出超时：P90 × 系数，限制在 [MIN_TIMEOUT, default_timeout]"""
+        with self._lock:
+            latencies: List[float] = sorted(self._entry(name)['latencies'])
+        if len(latencies) < 3:
+            return self.default_timeout
+        p90 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))]
+        return max(MIN_TIMEOUT, min(self.default_timeout, p90 * TIMEOUT_FACTOR))
+
+    def is_open(self, name: str) -> bool:
+        """熔断中（冷却期未过）则跳过该源；冷却结束后放行一次试探"""
+        with self._lock:
+            return time.time() < self._entry(name)['open_until']
+
+    def record_success(self, name: str, latency: float):
+        with self._lock:
+            entry = self._entry(name)
+            entry['latencies'] = (entry['latencies'] + [round(latency, 3)])[-LATENCY_HISTORY:]
+            entry['failures'] = 0
+            entry['open_until'] = 0.0
+
+    def record_failure(self, name: str):
+        with self._lock:
+            entry = self._entry(name)
+            entry['failures'] += 1
+            if entry['failures'] >= self.failure_threshold:
+                # 每多失败一次冷却时间翻倍
+                exponent = entry['failures'] - self.failure_threshold
+                cooldown = min(MAX_COOLDOWN, self.cooldown_seconds * (2 ** exponent))
+                entry['open_until'] = time.time() + cooldown
+                logger.warning(
+                    f"Source {name} failed {entry['failures']} times in a row, "
+                    f"skipping it for {cooldown / 60:.0f} min"
+                )
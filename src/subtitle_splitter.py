@@ -0,0 +1,234 @@
+"""
+字幕断句模块
+批量请求模型断句并校验，结果可写入/读取 subtitles.json，供多个 voice 任务复用
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from llm_client import get_llm_client
+
+logger = logging.getLogger(__name__)
+
+MAX_SUBTITLE_CHARS = 12
+
+# 视频中固定出现的口播文案
+DEFAULT_OPENING = '欢迎收听听闻天下。'
+DEFAULT_CLOSING = '以上就是今天的新闻播报，感谢收听，我们明天再见。'
+DOMESTIC_HEADER = '先看国内新闻。'
+INTERNATIONAL_HEADER = '再看国际新闻。'
+
+
+def normalize_news_item(news_item: Any) -> Dict[str, str]:
+    """兼容字典和对象两种新闻结构，统一成字典"""
+    if isinstance(news_item, dict):
+        title = news_item.get('title', '')
+        summary = news_item.get('summary') or news_item.get('content') or ''
+        source = news_item.get('source', '')
+    else:
+        title = getattr(news_item, 'title', '')
+        summary = getattr(news_item, 'summary', '') or getattr(news_item, 'content', '')
+        source = getattr(news_item, 'source', '')
+
+    return {
+        'title': title.strip() if title else '',
+        'summary': summary.strip() if summary else '',
+        'source': source.strip() if source else ''
+    }
+
+
+def script_sections(script: Dict, news_items: Optional[Sequence[Any]] = None) -> Tuple[List[Dict], List[Dict]]:
+    """脚本的 (国内, 国际) 新闻条目；预处理阶段与视频生成共用，保证段落文本一致"""
+    domestic = list(script.get('domestic_news') or [])
+    international = list(script.get('international_news') or [])
+
+    # 兼容旧脚本结构：从 `news` 字段推断分组
+    if not domestic and not international and isinstance(script.get('news'), list):
+        for item in script['news']:
+            if not isinstance(item, dict):
+                continue
+            if str(item.get('section', 'domestic')).strip().lower() == 'international':
+                international.append(item)
+            else:
+                domestic.append(item)
+
+    # 若脚本中无AI产出的结构，兜底使用原始新闻
+    if not domestic and not international:
+        for news in (normalize_news_item(item) for item in news_items or []):
+            title = (news['title'] or '今日要闻').strip()[:28]
+            summary = (news['summary'] or '').strip()[:36]
+            domestic.append({
+                'title': title,
+                'content': f"{title}。{summary}。",
+                'subtitle': f"{title}。{summary}。",
+                'section': 'domestic'
+            })
+    return domestic, international
+
+
+def script_subtitle_texts(script: Dict, news_items: Optional[Sequence[Any]] = None) -> List[str]:
+    """脚本中需要断句的全部文本（与视频段落一一对应）"""
+    texts = [script.get('opening', DEFAULT_OPENING)]
+    domestic, international = script_sections(script, news_items)
+    for header, items in ((DOMESTIC_HEADER, domestic), (INTERNATIONAL_HEADER, international)):
+        if items:
+            texts.append(header)
+        texts.extend(str(item.get('content', '')).strip() for item in items if isinstance(item, dict))
+    texts.append(script.get('closing', DEFAULT_CLOSING))
+    return [text for text in texts if text]
+
+
+class SubtitleSplitter:
+    """短字幕断句：模型批量断句 + 本地规则兜底，结果按文本缓存"""
+
+    def __init__(self):
+        # 断句模型（OpenAI兼容接口，连接池与限流进程内共享）
+        self.llm_client = get_llm_client()
+        self.enable_ai_subtitle_split = os.getenv('ENABLE_AI_SUBTITLE_SPLIT', 'true').lower() == 'true'
+        self.cache: Dict[str, List[str]] = {}
+
+    def split_local(self, text: str, max_chars: int) -> List[str]:
+        """本地规则断句兜底"""
+        parts = re.split(r'([。！？；：，、,.!?;:])', text)
+        sentences = []
+        for i in range(0, len(parts), 2):
+            sentence = parts[i]
+            punct = parts[i + 1] if i + 1 < len(parts) else ''
+            combined = f"{sentence}{punct}".strip()
+            if combined:
+                sentences.append(combined)
+
+        chunks = []
+        for sentence in sentences:
+            rest = sentence
+            while len(rest) > max_chars:
+                chunks.append(rest[:max_chars])
+                rest = rest[max_chars:]
+            if rest:
+                chunks.append(rest)
+
+        return chunks or [text[:max_chars]]
+
+    def _split_subtitles_batch_by_llm(self, texts: List[str], max_chars: int) -> Dict[int, List[str]]:
+        """使用x666/gemini一次性为多段文本断句，返回 {序号: 字幕行}"""
+        if not self.llm_client.enabled or not texts:
+            return {}
+
+        try:
+            items = [{"id": i, "text": text} for i, text in enumerate(texts)]
+            messages = [
+                {
+                    "role": "system",
+                    "content": (
+                        "你是中文新闻视频字幕断句助手。"
+                        "任务是把每段文本分别切成短字幕。"
+                        "每行最多12个汉字，尽量更短。"
+                        "保持语义连贯和逻辑完整，不改写、不扩写、不删除事实。"
+                        "优先在自然停顿处断句。"
+                        "输入是JSON数组，每项含id和text。"
+                        "仅输出JSON数组，每项形如{\"id\":0,\"lines\":[\"句子1\",\"句子2\"]}，"
+                        "id与输入一一对应。"
+                    )
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        f"请按“视频字幕”标准逐项断句。"
+                        f"要求：每行最多{max_chars}个汉字，能短则短，但语义要通顺连贯。"
+                        f"只返回JSON数组，不要额外说明。输入如下：\n"
+                        f"{json.dumps(items, ensure_ascii=False)}"
+                    )
+                }
+            ]
+            parsed = self.llm_client.chat_json(messages, temperature=0, timeout=60)
+            if not isinstance(parsed, list):
+                return {}
+
+            results: Dict[int, List[str]] = {}
+            for entry in parsed:
+                if not isinstance(entry, dict) or not isinstance(entry.get('lines'), list):
+                    continue
+                try:
+                    index = int(entry.get('id'))
+                except (TypeError, ValueError):
+                    continue
+                if not 0 <= index < len(texts):
+                    continue
+                lines = [str(line).strip() for line in entry['lines'] if str(line).strip()]
+                if self._valid_subtitle_lines(texts[index], lines, max_chars):
+                    results[index] = lines
+            return results
+        except Exception as e:
+            logger.warning(f"Subtitle split via x666 failed, fallback to local: {e}")
+            return {}
+
+    @staticmethod
+    def _valid_subtitle_lines(text: str, lines: List[str], max_chars: int) -> bool:
+        """模型断句结果需满足长度限制，且去掉标点后与原文一致"""
+        if not lines or any(len(line) > max_chars for line in lines):
+            return False
+        strip = lambda value: re.sub(r'[\W_]', '', value)
+        return strip(''.join(lines)) == strip(text)
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        return re.sub(r'\s+', '', text or '').strip()
+
+    @staticmethod
+    def _cache_key(cleaned: str, max_chars: int) -> str:
+        return f"{max_chars}:{cleaned}"
+
+    def split(self, text: str, max_chars: int = MAX_SUBTITLE_CHARS) -> List[str]:
+        """将文案拆分为短字幕片段，优先使用模型断句"""
+        return self.split_batch([text], max_chars)[0]
+
+    def split_batch(self, texts: List[str], max_chars: int = MAX_SUBTITLE_CHARS) -> List[List[str]]:
+        """批量断句：未命中缓存的文本合并为一次模型请求，逐条校验，不合格的条目用本地规则"""
+        cleaned_texts = [self._clean(text) for text in texts]
+        pending = []
+        for cleaned in cleaned_texts:
+            if cleaned and self._cache_key(cleaned, max_chars) not in self.cache and cleaned not in pending:
+                pending.append(cleaned)
+
+        if pending:
+            llm_results = {}
+            if self.enable_ai_subtitle_split:
+                llm_results = self._split_subtitles_batch_by_llm(pending, max_chars)
+                if len(llm_results) < len(pending):
+                    logger.info(
+                        f"Subtitle split: {len(llm_results)}/{len(pending)} from model, rest local"
+                    )
+            for i, cleaned in enumerate(pending):
+                chunks = llm_results.get(i) or self.split_local(cleaned, max_chars)
+                self.cache[self._cache_key(cleaned, max_chars)] = list(chunks)
+
+        return [
+            list(self.cache[self._cache_key(cleaned, max_chars)]) if cleaned else []
+            for cleaned in cleaned_texts
+        ]
+
+    def load(self, path: str) -> int:
+        """读取预生成的断句结果（subtitles.json）作为缓存，返回条目数"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        max_chars = int(data.get('max_chars', MAX_SUBTITLE_CHARS))
+        items = data.get('items', {})
+        for text, lines in items.items():
+            if isinstance(lines, list) and lines:
+                self.cache[self._cache_key(self._clean(text), max_chars)] = [str(line) for line in lines]
+        logger.info(f"Loaded {len(items)} subtitle splits from {path}")
+        return len(items)
+
+    def dump(self, path: str, texts: Iterable[str], max_chars: int = MAX_SUBTITLE_CHARS):
+        """为文本断句并写出 subtitles.json"""
+        texts = [text for text in dict.fromkeys(texts) if text]
+        results = self.split_batch(texts, max_chars)
+        payload = {
+            'max_chars': max_chars,
+            'items': {text: lines for text, lines in zip(texts, results) if lines},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,101 @@
+"""
+文本排版模块
+按字缓存字宽，前缀和 + 二分查找定位断行点，并遵循中文避头尾规则
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import ImageFont
+
+# 不能出现在行首的标点（避头）
+LINE_START_FORBIDDEN = frozenset(
+    '，。、；：？！…‥）》〉」』】〕〗｝］’”％‰℃·・～ー—'
+    ',.;:?!)]}%'
+)
+# 不能出现在行尾的标点（避尾）
+LINE_END_FORBIDDEN = frozenset('（《〈「『【〔〖｛［‘“([{')
+
+ELLIPSIS = '…'
+
+
+def _is_word_char(char: str) -> bool:
+    """拉丁字母/数字，连续出现时不拆开"""
+    return char.isascii() and (char.isalnum() or char in '.%')
+
+
+class LineBreaker:
+    """按像素宽度换行：每个 (字体, 字符) 的字宽只测量一次"""
+
+    def __init__(self):
+        self._advances: Dict[Tuple[ImageFont.FreeTypeFont, str], float] = {}
+
+    def advance(self, font: ImageFont.FreeTypeFont, char: str,
+                resolve: Optional[Callable[[str], ImageFont.FreeTypeFont]] = None) -> float:
+        """字符前进宽度；`resolve` 可为缺字字符指定实际绘制用的兜底字体"""
+        key = (font, char)
+        width = self._advances.get(key)
+        if width is None:
+            face = resolve(char) if resolve else font
+            width = face.getlength(char)
+            self._advances[key] = width
+        return width
+
+    def _adjust_break(self, text: str, start: int, end: int) -> int:
+        """在 [start, end) 内回退断行点，满足避头尾并避免拆开单词/数字"""
+        brk = end
+        while brk > start + 1 and (
+            text[brk] in LINE_START_FORBIDDEN
+            or text[brk - 1] in LINE_END_FORBIDDEN
+            or (_is_word_char(text[brk - 1]) and _is_word_char(text[brk]))
+        ):
+            brk -= 1
+        if brk > start + 1:
+            return brk
+        # 整行都无法合规断开：标点悬挂在行尾，否则按宽度硬断
+        if text[end] in LINE_START_FORBIDDEN:
+            return end + 1
+        return end
+
+    def wrap(self, text: str, font: ImageFont.FreeTypeFont, max_width: float, max_lines: int,
+             resolve: Optional[Callable[[str], ImageFont.FreeTypeFont]] = None) -> List[str]:
+        """换行并限制最大行数，超出部分在末行以省略号截断"""
+        if not text or max_lines <= 0:
+            return []
+
+        widths = [self.advance(font, char, resolve) for char in text]
+        prefix = list(accumulate(widths, initial=0.0))
+        total = len(text)
+
+        def skip_spaces(pos: int) -> int:
+            while pos < total and text[pos].isspace():
+                pos += 1
+            return pos
+
+        # 每行的 [起点, 终点)；断行处的空白既不留在行尾也不带到下一行行首，居中时不计入宽度
+        spans: List[Tuple[int, int]] = []
+        start = skip_spaces(0)
+        while start < total and len(spans) < max_lines:
+            # 满足 prefix[end] - prefix[start] <= max_width 的最大 end
+            end = bisect_right(prefix, prefix[start] + max_width, lo=start + 1) - 1
+            end = max(end, start + 1)
+            if end < total:
+                end = self._adjust_break(text, start, end)
+            line_end = end
+            while line_end > start and text[line_end - 1].isspace():
+                line_end -= 1
+            spans.append((start, line_end))
+            start = skip_spaces(end)
+
+        lines = [text[line_start:line_end] for line_start, line_end in spans]
+        if start < total and lines:
+            line_start, _ = spans[-1]
+            last = lines[-1]
+            ellipsis_width = self.advance(font, ELLIPSIS, resolve)
+            keep = len(last) - 1
+            while keep > 1 and prefix[line_start + keep] - prefix[line_start] + ellipsis_width > max_width:
+                keep -= 1
+            lines[-1] = (last[:keep].rstrip() + ELLIPSIS) if len(last) > 1 else last
+
+        return lines
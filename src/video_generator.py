@@ -7,30 +7,57 @@ import os
 import subprocess
 import json
 import asyncio
+import hashlib
+import shutil
 import re
-import time
 from pathlib import Path
-import requests
 import edge_tts
 from gtts import gTTS
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
 import numpy as np
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Tuple, Any, Optional
-from collections import deque
+from typing import List, Dict, Tuple, Any, Optional, Callable, Iterable
+from collections import deque, OrderedDict
+from functools import lru_cache
 import logging
 
+import audio_pcm
+from audio_probe import probe_duration
+from disk_cache import DiskCache
+from font_registry import get_font_registry
+from frame_encoder import RawPipeEncoder
+from subtitle_splitter import (
+    DEFAULT_CLOSING, DEFAULT_OPENING, DOMESTIC_HEADER, INTERNATIONAL_HEADER,
+    MAX_SUBTITLE_CHARS, SubtitleSplitter, script_sections,
+)
+from text_layout import LineBreaker
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class VideoGenerator:
     """新闻视频生成器"""
+
+    # 各 TTS 引擎默认并发数（edge-tts 为在线服务，gTTS 易被限流）
+    TTS_CONCURRENCY_DEFAULTS = {'edge': 4, 'gtts': 2}
+
+    # 科技背景生成参数（同时作为背景磁盘缓存键的一部分，修改后自动失效重建）
+    TECH_BACKGROUND_PARAMS = {
+        'version': 2,
+        'gradient_colors': [[3, 20, 105], [8, 52, 170], [9, 78, 190]],
+        'gradient_split': 0.55,
+        'flare_radii': [420, 40, -32],
+        'seed': 20260227,
+        'node_count': 72,
+        'link_distance': 280,
+    }
     
     def __init__(self, output_dir: str = 'output', assets_dir: str = 'assets'):
         self.output_dir = output_dir
         self.assets_dir = assets_dir
         self.temp_dir = os.path.join(output_dir, 'temp')
+        self.cache_dir = os.getenv('CACHE_DIR', '.cache')
         
         # 创建目录
         os.makedirs(self.output_dir, exist_ok=True)
@@ -42,101 +69,110 @@ class VideoGenerator:
         self.fps = 30
         self.video_codec = 'libx264'
         self.audio_codec = 'aac'
+        # slide: 每条字幕只渲染一张静帧，按时长拼接；frame: 逐帧渲染
+        self.render_mode = os.getenv('RENDER_MODE', 'slide').strip().lower()
+        if self.render_mode not in ('slide', 'frame'):
+            logger.warning(f"Unknown RENDER_MODE={self.render_mode!r}, fallback to slide")
+            self.render_mode = 'slide'
+        # pipe: 原始帧经管道直送 ffmpeg；png: 逐帧落盘后再编码（兜底）
+        self.video_encoder = os.getenv('VIDEO_ENCODER', 'pipe').strip().lower()
+        self.encoder_queue_size = max(1, int(os.getenv('ENCODER_QUEUE_SIZE', '8')))
+        # single: 整片一次编码；segments: 每个段落独立编码后流复制拼接
+        self.encode_mode = os.getenv('ENCODE_MODE', 'single').strip().lower()
+        if self.encode_mode not in ('single', 'segments'):
+            logger.warning(f"Unknown ENCODE_MODE={self.encode_mode!r}, fallback to single")
+            self.encode_mode = 'single'
+        segment_workers = int(os.getenv('SEGMENT_WORKERS', '0') or 0)
+        self.segment_workers = segment_workers if segment_workers > 0 else (os.cpu_count() or 1)
+        # 静帧（slide 模式）渲染进程数，默认使用全部 CPU 核心；1 表示在当前进程内串行渲染。
+        # frame 模式始终在当前进程内渲染：单帧合成仅约 2ms，跨进程回传整帧数组反而更慢
+        render_workers = int(os.getenv('RENDER_WORKERS', '0') or 0)
+        self.render_workers = render_workers if render_workers > 0 else (os.cpu_count() or 1)
+
+        # 段落缓存：同一天重跑时复用未变化段落的已编码片段（连同音频）。
+        # 仅 segments 模式启用：single 模式整片编码，没有可复用的段落产物，只缓存音频与语音缓存重复
+        self.block_cache: Optional[DiskCache] = None
+        if self.encode_mode == 'segments' and os.getenv('BLOCK_CACHE', 'true').lower() == 'true':
+            max_mb = int(os.getenv('BLOCK_CACHE_MAX_MB', '2048') or 2048)
+            self.block_cache = DiskCache(
+                os.path.join(self.cache_dir, 'blocks'), max_bytes=max_mb * 1024 * 1024, name='block'
+            )
         
-        # 字体配置
-        self.font_paths = self._find_fonts()
+        # 字体配置（进程内共享注册表，字体只扫描和加载一次）
+        self.font_registry = get_font_registry()
+        self.font_paths = self.font_registry.font_paths
+        self.line_breaker = LineBreaker()
         
         # TTS配置
         self.tts_engine = os.getenv('TTS_ENGINE', 'edge').strip().lower()
         self.tts_voice = os.getenv('TTS_VOICE', 'zh-CN-XiaoxiaoNeural')
         self.tts_rate = "+0%"
         self.tts_volume = "+0%"
+        self._failed_audio_paths = set()
+        # 由兜底引擎/音色合成的音频：不写入段落缓存，避免冒充配置的主音色
+        self._fallback_audio_paths = set()
+        self.tts_concurrency = self._read_tts_concurrency()
+        self.tts_cache: Optional[DiskCache] = None
+        if os.getenv('TTS_CACHE', 'true').lower() == 'true':
+            max_mb = int(os.getenv('TTS_CACHE_MAX_MB', '512') or 512)
+            self.tts_cache = DiskCache(
+                os.path.join(self.cache_dir, 'tts'), max_bytes=max_mb * 1024 * 1024, name='tts'
+            )
 
-        # 断句模型配置（OpenAI兼容接口）
-        self.x666_base_url = os.getenv('X666_BASE_URL', 'https://grok.oo9.dpdns.org/v1').rstrip('/')
-        self.x666_api_key = os.getenv('X666_API_KEY') or os.getenv('OPENAI_API_KEY', '')
-        self.x666_model = os.getenv('X666_MODEL', 'grok-4-fast-expert')
-        self.enable_ai_subtitle_split = os.getenv('ENABLE_AI_SUBTITLE_SPLIT', 'true').lower() == 'true'
-        self.subtitle_split_cache: Dict[str, List[str]] = {}
-        self._llm_request_timestamps = deque()
-        self._llm_rate_limit_window_seconds = 10.0
-        self._llm_rate_limit_max_requests = 10
+        # 字幕断句（可由 load_subtitle_splits 预热）
+        self.subtitle_splitter = SubtitleSplitter()
 
         # 预渲染科技背景模板，减少每帧绘制开销
-        self.base_background = self._create_tech_background()
+        self.base_background = self._load_tech_background()
         self.logo_image = self._load_logo_image()
 
+        # 分层合成：静态层（背景+角标+标题日期）按日期缓存，字幕仅渲染小块 RGBA
+        self._static_layer_cache: Dict[Tuple[str, str], np.ndarray] = {}
+        self._subtitle_patch_cache: OrderedDict = OrderedDict()
+        self._subtitle_patch_cache_size = 64
+
+    def _read_tts_concurrency(self) -> int:
+        """TTS 并发上限：TTS_CONCURRENCY_<ENGINE> 优先，其次 TTS_CONCURRENCY，最后按引擎默认"""
+        for key in (f'TTS_CONCURRENCY_{self.tts_engine.upper()}', 'TTS_CONCURRENCY'):
+            raw = os.getenv(key, '').strip()
+            if not raw:
+                continue
+            try:
+                return max(1, int(raw))
+            except ValueError:
+                logger.warning(f"Invalid {key}={raw!r}, ignored")
+        return self.TTS_CONCURRENCY_DEFAULTS.get(self.tts_engine, 1)
+
     def _beijing_now(self) -> datetime:
         """北京时间"""
         return datetime.now(timezone(timedelta(hours=8)))
     
-    def _find_fonts(self) -> Dict[str, str]:
-        """查找系统中可用的中文字体"""
-        font_paths = {
-            'title': None,
-            'subtitle': None,
-            'body': None
-        }
-        
-        # 常见中文字体路径
-        possible_fonts = [
-            '/usr/share/fonts/truetype/noto/NotoSansCJK-Bold.ttc',
-            '/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc',
-            '/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc',
-            '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
-            '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
-            '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
-            '/System/Library/Fonts/PingFang.ttc',
-            '/System/Library/Fonts/STHeiti Light.ttc',
-            'C:/Windows/Fonts/simhei.ttf',
-            'C:/Windows/Fonts/simsun.ttc',
-            'C:/Windows/Fonts/msyh.ttc',
-        ]
-        
-        for font_path in possible_fonts:
-            if os.path.exists(font_path):
-                font_paths['title'] = font_path
-                font_paths['subtitle'] = font_path
-                font_paths['body'] = font_path
-                logger.info(f"Found font: {font_path}")
-                break
-        
-        # 如果没有找到，使用默认字体
-        if not font_paths['title']:
-            logger.warning("No Chinese font found, using default")
-            font_paths['title'] = None
-            font_paths['subtitle'] = None
-            font_paths['body'] = None
-        
-        return font_paths
-    
     def _get_font(self, font_type: str, size: int) -> ImageFont.FreeTypeFont:
-        """获取指定类型和大小的字体"""
-        font_path = self.font_paths.get(font_type)
-        try:
-            if font_path:
-                return ImageFont.truetype(font_path, size)
-        except Exception as e:
-            logger.warning(f"Failed to load font {font_path}: {e}")
-        
-        return ImageFont.load_default()
-
-    def _normalize_news_item(self, news_item: Any) -> Dict[str, str]:
-        """兼容字典和对象两种新闻结构，统一成字典"""
-        if isinstance(news_item, dict):
-            title = news_item.get('title', '')
-            summary = news_item.get('summary') or news_item.get('content') or ''
-            source = news_item.get('source', '')
-        else:
-            title = getattr(news_item, 'title', '')
-            summary = getattr(news_item, 'summary', '') or getattr(news_item, 'content', '')
-            source = getattr(news_item, 'source', '')
-
-        return {
-            'title': title.strip() if title else '',
-            'summary': summary.strip() if summary else '',
-            'source': source.strip() if source else ''
-        }
+        """获取指定类型和大小的字体（进程内复用）"""
+        return self.font_registry.get_font(font_type, size)
+
+    def _text_width(self, draw: ImageDraw.Draw, text: str, font_type: str, size: int) -> int:
+        """按兜底字体分段测量文本宽度"""
+        segments = self.font_registry.segment(text, font_type, size)
+        if len(segments) == 1:
+            bbox = draw.textbbox((0, 0), text, font=segments[0][1])
+            return bbox[2] - bbox[0]
+        return int(round(sum(font.getlength(run) for run, font in segments)))
+
+    def _draw_text_runs(self, draw: ImageDraw.Draw, xy: Tuple[int, int], text: str,
+                        font_type: str, size: int, **kwargs):
+        """绘制文本；主字体缺字的片段改用兜底字体，按主字体基线对齐"""
+        segments = self.font_registry.segment(text, font_type, size)
+        if len(segments) == 1:
+            draw.text(xy, text, font=segments[0][1], **kwargs)
+            return
+
+        x, y = xy
+        primary = self._get_font(font_type, size)
+        baseline = y + primary.getmetrics()[0]
+        for run, font in segments:
+            draw.text((x, baseline), run, font=font, anchor='ls', **kwargs)
+            x += font.getlength(run)
 
     def _compose_news_tts_text(self, index: int, item: Dict[str, Any]) -> str:
         """生成每条新闻的口播文本，仅朗读正文内容（不朗读标题）。"""
@@ -167,245 +203,126 @@ class VideoGenerator:
         logger.warning("logo.png not found, fallback to text badge")
         return None
 
-    def _split_short_subtitles_local(self, text: str, max_chars: int) -> List[str]:
-        """本地规则断句兜底"""
-        parts = re.split(r'([。！？；：，、,.!?;:])', text)
-        sentences = []
-        for i in range(0, len(parts), 2):
-            sentence = parts[i]
-            punct = parts[i + 1] if i + 1 < len(parts) else ''
-            combined = f"{sentence}{punct}".strip()
-            if combined:
-                sentences.append(combined)
-
-        chunks = []
-        for sentence in sentences:
-            rest = sentence
-            while len(rest) > max_chars:
-                chunks.append(rest[:max_chars])
-                rest = rest[max_chars:]
-            if rest:
-                chunks.append(rest)
-
-        return chunks or [text[:max_chars]]
-
-    def _split_short_subtitles_by_llm(self, text: str, max_chars: int) -> List[str]:
-        """使用x666/gemini进行断句"""
-        if not self.x666_api_key:
-            return []
-
-        try:
-            url = f"{self.x666_base_url}/chat/completions"
-            payload = {
-                "model": self.x666_model,
-                "temperature": 0,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "你是中文新闻视频字幕断句助手。"
-                            "任务是把文本切成短字幕。"
-                            "每行最多12个汉字，尽量更短。"
-                            "保持语义连贯和逻辑完整，不改写、不扩写、不删除事实。"
-                            "优先在自然停顿处断句。"
-                            "仅输出JSON数组，例如：[\"句子1\",\"句子2\"]。"
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"请按“视频字幕”标准断句。"
-                            f"要求：每行最多{max_chars}个汉字，能短则短，但语义要通顺连贯。"
-                            f"只返回JSON数组，不要额外说明。文本如下：\n{text}"
-                        )
-                    }
-                ]
-            }
-            headers = {
-                "Authorization": f"Bearer {self.x666_api_key}",
-                "Content-Type": "application/json",
-            }
-            self._throttle_llm_request()
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            content = (
-                data.get('choices', [{}])[0]
-                .get('message', {})
-                .get('content', '')
-                .strip()
-            )
-            if not content:
-                return []
-
-            # 兼容 ```json ... ``` 输出
-            fence_match = re.search(r'```(?:json)?\s*(.*?)\s*```', content, re.S)
-            if fence_match:
-                content = fence_match.group(1).strip()
-
-            parsed = json.loads(content)
-            if not isinstance(parsed, list):
-                return []
-
-            chunks: List[str] = []
-            for item in parsed:
-                line = str(item).strip()
-                if not line:
-                    continue
-                if len(line) <= max_chars:
-                    chunks.append(line)
-                else:
-                    chunks.extend(self._split_short_subtitles_local(line, max_chars))
-            return chunks
-        except Exception as e:
-            logger.warning(f"Subtitle split via x666 failed, fallback to local: {e}")
-            return []
-
-    def _throttle_llm_request(self):
-        """限制 LLM 请求速率，避免超过 10 req / 10s"""
-        now = time.monotonic()
-        while self._llm_request_timestamps and (
-            now - self._llm_request_timestamps[0] >= self._llm_rate_limit_window_seconds
-        ):
-            self._llm_request_timestamps.popleft()
-
-        if len(self._llm_request_timestamps) >= self._llm_rate_limit_max_requests:
-            sleep_seconds = self._llm_rate_limit_window_seconds - (
-                now - self._llm_request_timestamps[0]
-            ) + 0.05
-            if sleep_seconds > 0:
-                logger.info(f"LLM rate limit guard sleep: {sleep_seconds:.2f}s")
-                time.sleep(sleep_seconds)
-
-            now = time.monotonic()
-            while self._llm_request_timestamps and (
-                now - self._llm_request_timestamps[0] >= self._llm_rate_limit_window_seconds
-            ):
-                self._llm_request_timestamps.popleft()
-
-        self._llm_request_timestamps.append(time.monotonic())
-
-    def _split_short_subtitles(self, text: str, max_chars: int = 12) -> List[str]:
-        """将文案拆分为短字幕片段，优先使用模型断句"""
-        if not text:
-            return []
-
-        cleaned = re.sub(r'\s+', '', text).strip()
-        if not cleaned:
-            return []
-
-        cache_key = f"{max_chars}:{cleaned}"
-        if cache_key in self.subtitle_split_cache:
-            return list(self.subtitle_split_cache[cache_key])
-
-        if self.enable_ai_subtitle_split:
-            chunks = self._split_short_subtitles_by_llm(cleaned, max_chars)
-            if not chunks:
-                chunks = self._split_short_subtitles_local(cleaned, max_chars)
-        else:
-            chunks = self._split_short_subtitles_local(cleaned, max_chars)
-
-        self.subtitle_split_cache[cache_key] = list(chunks)
-        return chunks
-
-    def _wrap_text_lines(self, draw: ImageDraw.Draw, text: str, font: ImageFont.FreeTypeFont,
+    def _wrap_text_lines(self, text: str, font_type: str, size: int,
                          max_width: int, max_lines: int) -> List[str]:
-        """按像素宽度换行，限制最大行数"""
-        lines = []
-        current = ""
-        for char in text:
-            test = current + char
-            bbox = draw.textbbox((0, 0), test, font=font)
-            if bbox[2] - bbox[0] > max_width and current:
-                lines.append(current)
-                current = char
-                if len(lines) >= max_lines:
-                    break
-            else:
-                current = test
+        """按像素宽度换行，限制最大行数（字宽缓存 + 二分查找 + 避头尾）"""
+        return self.line_breaker.wrap(
+            text,
+            self._get_font(font_type, size),
+            max_width,
+            max_lines,
+            resolve=lambda char: self.font_registry.font_for_char(font_type, size, char)
+        )
 
-        if len(lines) < max_lines and current:
-            lines.append(current)
+    def _load_tech_background(self) -> np.ndarray:
+        """加载科技背景：按分辨率和生成参数缓存为 .npy，命中时内存映射只读加载"""
+        key_payload = json.dumps(
+            {'width': self.width, 'height': self.height, 'params': self.TECH_BACKGROUND_PARAMS},
+            sort_keys=True
+        )
+        key = hashlib.sha256(key_payload.encode('utf-8')).hexdigest()[:16]
+        cache_dir = Path(self.cache_dir) / 'backgrounds'
+        cache_path = cache_dir / f'tech_bg_{self.width}x{self.height}_{key}.npy'
 
-        if len(lines) == max_lines and ''.join(lines) != text:
-            last = lines[-1]
-            lines[-1] = (last[:-1] + '…') if len(last) > 1 else last
+        if cache_path.exists():
+            try:
+                background = np.load(cache_path, mmap_mode='r')
+                if background.shape == (self.height, self.width, 3) and background.dtype == np.uint8:
+                    return background
+                logger.warning(f"Ignoring mismatched background cache: {cache_path}")
+            except Exception as e:
+                logger.warning(f"Failed to load background cache {cache_path}: {e}")
 
-        return lines
+        background = self._create_tech_background()
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f'{cache_path.stem}.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f, background)
+            os.replace(tmp_path, cache_path)
+            logger.info(f"Cached tech background: {cache_path}")
+        except OSError as e:
+            logger.warning(f"Failed to cache background {cache_path}: {e}")
+        return background
 
     def _create_tech_background(self) -> np.ndarray:
         """创建蓝色科技风背景模板（一次生成，多帧复用）"""
-        img = Image.new('RGBA', (self.width, self.height), (5, 22, 110, 255))
-        draw = ImageDraw.Draw(img)
-
-        # 蓝色渐变
-        top = np.array([3, 20, 105], dtype=float)
-        mid = np.array([8, 52, 170], dtype=float)
-        bottom = np.array([9, 78, 190], dtype=float)
-        for y in range(self.height):
-            t = y / max(self.height - 1, 1)
-            if t < 0.55:
-                k = t / 0.55
-                color = top * (1 - k) + mid * k
-            else:
-                k = (t - 0.55) / 0.45
-                color = mid * (1 - k) + bottom * k
-            draw.line([(0, y), (self.width, y)], fill=tuple(int(v) for v in color))
-
-        overlay = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
+        params = self.TECH_BACKGROUND_PARAMS
+
+        # 蓝色渐变：逐行颜色一次算出，再广播到整幅画面
+        top, mid, bottom = (np.array(c, dtype=float) for c in params['gradient_colors'])
+        split = params['gradient_split']
+        t = np.arange(self.height, dtype=float) / max(self.height - 1, 1)
+        k_upper = (t / split)[:, None]
+        k_lower = ((t - split) / (1 - split))[:, None]
+        row_colors = np.where(
+            (t < split)[:, None],
+            top * (1 - k_upper) + mid * k_upper,
+            mid * (1 - k_lower) + bottom * k_lower
+        ).astype(np.uint8)
+        base = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        base[..., :3] = row_colors[:, None, :]
+        base[..., 3] = 255
+        img = Image.fromarray(base, 'RGBA')
+
+        # 左侧镜头光：同心圆由外到内覆盖，每个像素取包含它的最小半径对应的 alpha
+        overlay_arr = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        fx, fy = -120, int(self.height * 0.70)
+        radii = np.arange(*params['flare_radii'])[::-1]
+        alphas = (140 * (radii / radii[-1]) ** 2).astype(np.uint8)
+        r_max = int(radii[-1])
+        x1, y0, y1 = min(self.width, fx + r_max + 1), max(0, fy - r_max), min(self.height, fy + r_max + 1)
+        if x1 > 0 and y1 > y0:
+            ys, xs = np.ogrid[y0:y1, 0:x1]
+            dist = np.sqrt((xs - fx) ** 2 + (ys - fy) ** 2)
+            # PIL 椭圆包含边界像素，等效半径约为 r + 0.5
+            ring = np.searchsorted(radii, dist - 0.5, side='left')
+            inside = ring < len(radii)
+            region = overlay_arr[y0:y1, 0:x1]
+            region[inside] = np.column_stack([
+                np.broadcast_to(np.array([80, 200, 255], dtype=np.uint8), (int(inside.sum()), 3)),
+                alphas[ring[inside]]
+            ])
+        overlay = Image.fromarray(overlay_arr, 'RGBA')
         od = ImageDraw.Draw(overlay)
 
-        # 左侧镜头光
-        flare_center = (-120, int(self.height * 0.70))
-        for r in range(420, 40, -32):
-            alpha = int(140 * (r / 420) ** 2)
-            od.ellipse(
-                [flare_center[0] - r, flare_center[1] - r, flare_center[0] + r, flare_center[1] + r],
-                fill=(80, 200, 255, alpha)
-            )
+        # 科技网格节点：两两距离一次算出，仅对近邻连线
+        rng = np.random.default_rng(params['seed'])
+        nodes = rng.uniform(
+            [110, 70],
+            [self.width - 110, self.height - 70],
+            size=(params['node_count'], 2)
+        ).astype(int)
+
+        max_dist2 = params['link_distance'] ** 2
+        delta = nodes[:, None, :] - nodes[None, :, :]
+        dist2 = (delta ** 2).sum(axis=-1)
+        pair_i, pair_j = np.triu_indices(len(nodes), k=1)
+        pair_d2 = dist2[pair_i, pair_j]
+        linked = pair_d2 <= max_dist2
+        link_alpha = (120 * (1 - pair_d2[linked] / max_dist2)).astype(int)
+        for (x1, y1), (x2, y2), alpha in zip(
+            nodes[pair_i[linked]].tolist(), nodes[pair_j[linked]].tolist(), link_alpha.tolist()
+        ):
+            od.line([(x1, y1), (x2, y2)], fill=(140, 205, 255, alpha), width=2)
 
-        # 科技网格节点
-        rng = np.random.default_rng(20260227)
-        nodes = []
-        for _ in range(72):
-            nodes.append((
-                int(rng.uniform(110, self.width - 110)),
-                int(rng.uniform(70, self.height - 70))
-            ))
-
-        max_dist2 = 280 * 280
-        for i in range(len(nodes)):
-            x1, y1 = nodes[i]
-            for j in range(i + 1, len(nodes)):
-                x2, y2 = nodes[j]
-                dx = x2 - x1
-                dy = y2 - y1
-                d2 = dx * dx + dy * dy
-                if d2 <= max_dist2:
-                    alpha = int(120 * (1 - d2 / max_dist2))
-                    od.line([(x1, y1), (x2, y2)], fill=(140, 205, 255, alpha), width=2)
-
-        for x, y in nodes:
+        for x, y in nodes.tolist():
             od.ellipse([x - 4, y - 4, x + 4, y + 4], fill=(230, 245, 255, 220))
             od.ellipse([x - 10, y - 10, x + 10, y + 10], outline=(150, 210, 255, 90), width=1)
 
-        # 中央波形网格
+        # 中央波形网格：所有折线顶点一次算出
         cx = int(self.width * 0.44)
-        for i in range(-18, 19):
-            x0 = cx + i * 18
-            pts = []
-            for y in range(-30, self.height + 30, 18):
-                offset = int(34 * np.sin((y / 130.0) + i * 0.32))
-                pts.append((x0 + offset, y))
-            od.line(pts, fill=(185, 225, 255, 70), width=2)
-
-        for j in range(8, 46):
-            y0 = j * 22
-            pts = []
-            for x in range(180, self.width - 120, 22):
-                offset = int(22 * np.sin((x / 140.0) + j * 0.18))
-                pts.append((x, y0 + offset))
-            od.line(pts, fill=(180, 220, 255, 42), width=1)
+        cols = np.arange(-18, 19)[:, None]
+        wave_y = np.arange(-30, self.height + 30, 18)[None, :]
+        wave_x = cx + cols * 18 + (34 * np.sin((wave_y / 130.0) + cols * 0.32)).astype(int)
+        for xs_row in wave_x.tolist():
+            od.line(list(zip(xs_row, wave_y[0].tolist())), fill=(185, 225, 255, 70), width=2)
+
+        rows = np.arange(8, 46)[:, None]
+        grid_x = np.arange(180, self.width - 120, 22)[None, :]
+        grid_y = rows * 22 + (22 * np.sin((grid_x / 140.0) + rows * 0.18)).astype(int)
+        for ys_row in grid_y.tolist():
+            od.line(list(zip(grid_x[0].tolist(), ys_row)), fill=(180, 220, 255, 42), width=1)
 
         img = Image.alpha_composite(img, overlay)
         return np.array(img.convert('RGB'))
@@ -494,55 +411,107 @@ class VideoGenerator:
             stroke_fill=(248, 248, 255)
         )
 
-    def _draw_subtitle(self, draw: ImageDraw.Draw, subtitle: str):
-        """绘制底部短字幕"""
+    def _draw_subtitle(self, draw: ImageDraw.Draw, subtitle: str,
+                       origin: Tuple[int, int] = (0, 0)):
+        """绘制底部短字幕（`origin` 为画布左上角在整帧中的坐标）"""
         if not subtitle:
             return
 
-        subtitle_font = self._get_font('title', 92)
         text = subtitle.strip()
         max_text_width = self.width - 150
-        lines = self._wrap_text_lines(draw, text, subtitle_font, max_text_width, max_lines=2)
+        lines = self._wrap_text_lines(text, 'title', 92, max_text_width, max_lines=2)
         if not lines:
             return
 
+        ox, oy = origin
         line_height = 108
         start_y = self.height - 220 - (len(lines) - 1) * line_height
         for i, line in enumerate(lines):
-            bbox = draw.textbbox((0, 0), line, font=subtitle_font)
-            line_width = bbox[2] - bbox[0]
-            x = (self.width - line_width) // 2
-            y = start_y + i * line_height
-            draw.text(
+            line_width = self._text_width(draw, line, 'title', 92)
+            x = (self.width - line_width) // 2 - ox
+            y = start_y + i * line_height - oy
+            self._draw_text_runs(
+                draw,
                 (x + 4, y + 5),
                 line,
-                font=subtitle_font,
+                'title', 92,
                 fill=(60, 0, 0),
                 stroke_width=12,
                 stroke_fill=(40, 0, 0)
             )
-            draw.text(
+            self._draw_text_runs(
+                draw,
                 (x, y),
                 line,
-                font=subtitle_font,
+                'title', 92,
                 fill=(255, 224, 60),
                 stroke_width=10,
                 stroke_fill=(175, 8, 8)
             )
-    
+
+    def _get_static_layer(self, date_str: str, weekday_str: str) -> np.ndarray:
+        """静态层（背景 + 角标 + 主标题日期），每个 (日期, 星期) 只合成一次"""
+        key = (date_str, weekday_str)
+        layer = self._static_layer_cache.get(key)
+        if layer is None:
+            img = Image.fromarray(np.array(self.base_background))
+            draw = ImageDraw.Draw(img)
+            self._draw_brand_badge(img, draw)
+            self._draw_main_title_block(draw, date_str, weekday_str)
+            layer = np.array(img)
+            layer.flags.writeable = False
+            if len(self._static_layer_cache) >= 4:
+                self._static_layer_cache.pop(next(iter(self._static_layer_cache)))
+            self._static_layer_cache[key] = layer
+        return layer
+
+    def _render_subtitle_patch(self, subtitle: str) -> Optional[Tuple[int, int, np.ndarray, np.ndarray]]:
+        """把字幕渲染为裁剪到包围盒的 RGBA 小块
+
+        返回 (x0, y0, 预乘颜色, 反向 alpha)，均为 uint16，便于直接整数混合。
+        """
+        text = (subtitle or '').strip()
+        if not text:
+            return None
+        if text in self._subtitle_patch_cache:
+            self._subtitle_patch_cache.move_to_end(text)
+            return self._subtitle_patch_cache[text]
+
+        # 字幕最多两行，带描边余量的底部条带即可容纳
+        band_top = max(0, self.height - 220 - 108 - 60)
+        band = Image.new('RGBA', (self.width, self.height - band_top), (0, 0, 0, 0))
+        self._draw_subtitle(ImageDraw.Draw(band), text, origin=(0, band_top))
+
+        patch = None
+        bbox = band.getchannel('A').getbbox()
+        if bbox:
+            rgba = np.asarray(band.crop(bbox), dtype=np.uint16)
+            alpha = rgba[..., 3:4]
+            patch = (bbox[0], band_top + bbox[1], rgba[..., :3] * alpha, 255 - alpha)
+
+        self._subtitle_patch_cache[text] = patch
+        if len(self._subtitle_patch_cache) > self._subtitle_patch_cache_size:
+            self._subtitle_patch_cache.popitem(last=False)
+        return patch
+
+    def _compose_frame(self, date_str: str, weekday_str: str,
+                       subtitle: Optional[str] = None) -> np.ndarray:
+        """静态层 + 字幕小块，仅在字幕包围盒内做 alpha 混合"""
+        frame = self._get_static_layer(date_str, weekday_str).copy()
+        patch = self._render_subtitle_patch(subtitle or "")
+        if patch is not None:
+            x0, y0, premultiplied, inverse_alpha = patch
+            h, w = inverse_alpha.shape[:2]
+            region = frame[y0:y0 + h, x0:x0 + w]
+            # rgb*a + dst*(255-a) <= 255*255，uint16 不会溢出
+            region[...] = (premultiplied + region * inverse_alpha + 127) // 255
+        return frame
+
     def create_background_frame(self, date_str: str, weekday_str: str,
                                 progress: float = 0, is_intro: bool = True,
                                 subtitle: Optional[str] = None) -> np.ndarray:
         """创建背景帧"""
-        img = Image.fromarray(self.base_background.copy())
-        draw = ImageDraw.Draw(img)
-
-        self._draw_brand_badge(img, draw)
-        self._draw_main_title_block(draw, date_str, weekday_str)
-
-        self._draw_subtitle(draw, subtitle or "")
-        
-        return np.array(img)
+        return self._compose_frame(date_str, weekday_str, subtitle)
     
     def _add_light_rays(self, draw: ImageDraw.Draw, progress: float):
         """添加光线效果"""
@@ -669,76 +638,126 @@ class VideoGenerator:
                           display_date: Optional[str] = None,
                           display_weekday: Optional[str] = None) -> np.ndarray:
         """创建新闻内容帧（仅保留主视觉与字幕）"""
-        img = Image.fromarray(self.base_background.copy())
-        draw = ImageDraw.Draw(img)
-
-        self._draw_brand_badge(img, draw)
         date_str = display_date or self._beijing_now().strftime("%m月%d日")
         weekday_str = display_weekday or self._beijing_now().strftime("星期%w").replace("0", "日").replace("1", "一").replace("2", "二").replace("3", "三").replace("4", "四").replace("5", "五").replace("6", "六")
-        self._draw_main_title_block(draw, date_str, weekday_str)
-        self._draw_subtitle(draw, subtitle or "")
-        
-        return np.array(img)
+        return self._compose_frame(date_str, weekday_str, subtitle)
     
     def create_ending_frame(self, progress: float,
                             subtitle: Optional[str] = None,
                             display_date: Optional[str] = None,
                             display_weekday: Optional[str] = None) -> np.ndarray:
         """创建结束帧（保持中间日期主视觉）"""
-        img = Image.fromarray(self.base_background.copy())
-        draw = ImageDraw.Draw(img)
-
-        self._draw_brand_badge(img, draw)
         date_str = display_date or self._beijing_now().strftime("%m月%d日")
         weekday_str = display_weekday or self._beijing_now().strftime("星期%w").replace("0", "日").replace("1", "一").replace("2", "二").replace("3", "三").replace("4", "四").replace("5", "五").replace("6", "六")
-        self._draw_main_title_block(draw, date_str, weekday_str)
-
-        # 底部短字幕
-        self._draw_subtitle(draw, subtitle or "")
-        
-        return np.array(img)
+        # 静态主视觉 + 底部短字幕
+        return self._compose_frame(date_str, weekday_str, subtitle)
     
+    @staticmethod
+    async def _run_command_async(cmd: List[str]) -> Tuple[int, str, str]:
+        """异步运行外部命令（ffmpeg/ffprobe），等待期间不阻塞事件循环"""
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        return (
+            process.returncode,
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'),
+        )
+
+    @staticmethod
+    def _duration_probe_command(audio_path: str) -> List[str]:
+        return ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                '-of', 'default=noprint_wrappers=1:nokey=1', audio_path]
+
+    @staticmethod
+    def _parse_probe_duration(audio_path: str, returncode: int, stdout: str, stderr: str) -> float:
+        if returncode != 0 or not stdout.strip():
+            raise RuntimeError(f"Failed to probe duration for {audio_path}: {stderr}")
+        return float(stdout.strip())
+
     def _get_audio_duration(self, audio_path: str) -> float:
-        """获取音频时长（秒）"""
+        """获取音频时长（秒）：优先解析文件头，无法识别时再调用 ffprobe"""
+        duration = probe_duration(audio_path)
+        if duration is not None:
+            return duration
         probe = subprocess.run(
-            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-             '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
-            capture_output=True, text=True
+            self._duration_probe_command(audio_path), capture_output=True, text=True
         )
-        if probe.returncode != 0 or not probe.stdout.strip():
-            raise RuntimeError(f"Failed to probe duration for {audio_path}: {probe.stderr}")
-        return float(probe.stdout.strip())
+        return self._parse_probe_duration(audio_path, probe.returncode, probe.stdout, probe.stderr)
+
+    async def _get_audio_duration_async(self, audio_path: str) -> float:
+        """获取音频时长（秒），异步版本"""
+        duration = probe_duration(audio_path)
+        if duration is not None:
+            return duration
+        returncode, stdout, stderr = await self._run_command_async(
+            self._duration_probe_command(audio_path)
+        )
+        return self._parse_probe_duration(audio_path, returncode, stdout, stderr)
 
     def _generate_silent_audio(self, output_path: str, duration: float) -> float:
-        """生成静音音频作为最终兜底，避免流程中断"""
+        """生成静音音频（进程内写 WAV）作为最终兜底，避免流程中断"""
         safe_duration = max(0.6, min(duration, 3.0))
-        cmd = [
-            'ffmpeg', '-y',
-            '-f', 'lavfi',
-            '-i', 'anullsrc=r=24000:cl=mono',
-            '-t', f'{safe_duration:.2f}',
-            '-q:a', '9',
-            '-acodec', 'libmp3lame',
-            output_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"Failed to generate silent audio: {result.stderr}")
-        return self._get_audio_duration(output_path)
+        return audio_pcm.write_silence(output_path, safe_duration)
+
+    def _tts_cache_key(self, engine: str, voice: str, text: str) -> str:
+        """TTS 缓存键：引擎、音色、语速、音量与规范化文本"""
+        return DiskCache.make_key({
+            'engine': engine,
+            'voice': voice,
+            'rate': self.tts_rate if engine == 'edge' else None,
+            'volume': self.tts_volume if engine == 'edge' else None,
+            'text': text,
+        })
+
+    def _load_tts_cache(self, key: str, output_path: str) -> Optional[float]:
+        """命中时复制缓存音频到 `output_path` 并返回记录的时长（不再调用 ffprobe）"""
+        if not self.tts_cache:
+            return None
+        meta = self.tts_cache.get(key)
+        if not meta:
+            return None
+        try:
+            shutil.copyfile(self.tts_cache.path(key, meta['audio']), output_path)
+        except OSError as e:
+            logger.warning(f"Failed to read TTS cache entry {key[:12]}: {e}")
+            return None
+        logger.info(f"TTS cache hit: {output_path}, duration: {meta['duration']:.2f}s")
+        return meta['duration']
+
+    def _store_tts_cache(self, key: str, audio_path: str, duration: float):
+        if not self.tts_cache:
+            return
+        audio_name = 'audio' + os.path.splitext(audio_path)[1]
+        self.tts_cache.put(key, {'duration': duration, 'audio': audio_name},
+                           files={audio_name: audio_path})
 
     async def generate_audio(self, text: str, output_path: str) -> float:
         """生成音频（支持 edge-tts / gtts）"""
+        self._failed_audio_paths.discard(output_path)
+        self._fallback_audio_paths.discard(output_path)
         cleaned_text = re.sub(r'\s+', ' ', text or '').strip()
         if not cleaned_text:
             return self._generate_silent_audio(output_path, 0.8)
 
         if self.tts_engine == 'gtts':
+            cache_key = self._tts_cache_key('gtts', 'zh-CN', cleaned_text)
+            cached_duration = await asyncio.to_thread(self._load_tts_cache, cache_key, output_path)
+            if cached_duration is not None:
+                return cached_duration
             try:
-                gTTS(text=cleaned_text, lang='zh-CN').save(output_path)
-                duration = self._get_audio_duration(output_path)
+                # gTTS 是同步 HTTP 调用，放到线程池执行
+                tts = gTTS(text=cleaned_text, lang='zh-CN')
+                await asyncio.to_thread(tts.save, output_path)
+                duration = await self._get_audio_duration_async(output_path)
                 logger.info(
                     f"Generated audio: {output_path}, duration: {duration:.2f}s, engine: gtts"
                 )
+                await asyncio.to_thread(self._store_tts_cache, cache_key, output_path, duration)
                 return duration
             except Exception as e:
                 logger.warning(f"gTTS failed, fallback to edge-tts: {e}")
@@ -750,6 +769,13 @@ class VideoGenerator:
 
         last_error = None
         for voice in voices:
+            # 按实际音色缓存，兜底音色的结果不会冒充主音色
+            if self.tts_engine == 'gtts' or voice != self.tts_voice:
+                self._fallback_audio_paths.add(output_path)
+            cache_key = self._tts_cache_key('edge', voice, cleaned_text)
+            cached_duration = await asyncio.to_thread(self._load_tts_cache, cache_key, output_path)
+            if cached_duration is not None:
+                return cached_duration
             for attempt in range(3):
                 try:
                     communicate = edge_tts.Communicate(
@@ -759,10 +785,11 @@ class VideoGenerator:
                         volume=self.tts_volume
                     )
                     await communicate.save(output_path)
-                    duration = self._get_audio_duration(output_path)
+                    duration = await self._get_audio_duration_async(output_path)
                     logger.info(
                         f"Generated audio: {output_path}, duration: {duration:.2f}s, voice: {voice}"
                     )
+                    await asyncio.to_thread(self._store_tts_cache, cache_key, output_path, duration)
                     return duration
                 except Exception as e:
                     last_error = e
@@ -773,53 +800,89 @@ class VideoGenerator:
                     await asyncio.sleep(wait_seconds)
 
         logger.error(f"Error generating audio after retries: {last_error}")
-        # 兜底静音，避免整个工作流失败
+        # 兜底静音，避免整个工作流失败（不写入缓存）
+        self._failed_audio_paths.add(output_path)
         fallback_duration = max(0.8, min(len(cleaned_text) * 0.18, 3.0))
         return self._generate_silent_audio(output_path, fallback_duration)
 
-    def concat_audio_segments(self, audio_paths: List[str], output_path: str):
-        """合并音频片段"""
-        list_path = os.path.abspath(os.path.join(self.temp_dir, 'audio_segments.txt'))
-        with open(list_path, 'w', encoding='utf-8') as f:
-            for path in audio_paths:
-                absolute_path = os.path.abspath(path)
-                escaped = absolute_path.replace("'", "'\\''")
-                f.write(f"file '{escaped}'\n")
+    def concat_audio_segments(self, audio_paths: List[str], output_path: str,
+                              durations: Optional[List[float]] = None) -> float:
+        """合并音频片段：解码为 PCM 后按段落时长对齐拼接，输出 WAV（最终封装时只编码一次）"""
+        clips = audio_pcm.decode_clips(audio_paths)
+        pcm = audio_pcm.assemble(clips, durations)
+        audio_pcm.write_wav(output_path, pcm)
+        return len(pcm) / audio_pcm.SAMPLE_RATE
 
-        cmd = [
-            'ffmpeg', '-y',
-            '-f', 'concat',
-            '-safe', '0',
-            '-i', list_path,
-            '-c:a', 'libmp3lame',
-            '-b:a', '192k',
-            output_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if os.path.exists(list_path):
-            os.remove(list_path)
-
-        if result.returncode != 0:
-            logger.error(f"Audio concat error: {result.stderr}")
-            raise RuntimeError(f"Failed to concat audio: {result.stderr}")
-    
     def frames_to_video(self, frames: List[np.ndarray], output_path: str, 
                         duration: float, audio_path: str = None):
         """将帧序列转换为视频"""
+        self._encode_frames(
+            lambda: iter(frames),
+            total_frames=len(frames),
+            output_path=output_path,
+            duration=duration,
+            audio_path=audio_path
+        )
+
+    def _encode_frames(self, frame_source: Callable[[], Iterable[np.ndarray]], total_frames: int,
+                       output_path: str, duration: float, audio_path: Optional[str] = None):
+        """编码帧序列：优先走 rawvideo 管道，失败时回退到 PNG 目录
+
+        `frame_source` 每次调用返回一个新的帧迭代器，回退时会重新渲染。
+        """
+        if total_frames <= 0:
+            raise RuntimeError("No frames to encode")
+
+        if self.video_encoder == 'pipe':
+            try:
+                self._encode_frames_via_pipe(
+                    frame_source(), total_frames, output_path, duration, audio_path
+                )
+                return
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"Raw pipe encoding failed, fallback to PNG frames: {e}")
+
+        self._encode_frames_via_png_dir(
+            frame_source(), total_frames, output_path, duration, audio_path
+        )
+
+    def _encode_frames_via_pipe(self, frames: Iterable[np.ndarray], total_frames: int,
+                                output_path: str, duration: float,
+                                audio_path: Optional[str] = None):
+        """启动一次 ffmpeg，把原始 RGB 帧写入其 stdin"""
+        fps = total_frames / duration if duration > 0 else self.fps
+        encoder = RawPipeEncoder(
+            output_path=output_path,
+            width=self.width,
+            height=self.height,
+            fps=fps,
+            video_codec=self.video_codec,
+            audio_path=audio_path if audio_path and os.path.exists(audio_path) else None,
+            audio_codec=self.audio_codec,
+            queue_size=self.encoder_queue_size
+        )
+        with encoder:
+            for frame in frames:
+                encoder.write(frame)
+
+    def _encode_frames_via_png_dir(self, frames: Iterable[np.ndarray], total_frames: int,
+                                   output_path: str, duration: float,
+                                   audio_path: Optional[str] = None):
+        """逐帧保存为 PNG 后编码（兜底路径）"""
         import tempfile
         import shutil
-        
-        # 保存帧为临时图片
+
         frame_dir = tempfile.mkdtemp()
         try:
-            for i, frame in enumerate(frames):
-                frame_path = os.path.join(frame_dir, f"frame_{i:06d}.png")
+            written = 0
+            for frame in frames:
+                frame_path = os.path.join(frame_dir, f"frame_{written:06d}.png")
                 Image.fromarray(frame).save(frame_path)
-            
+                written += 1
+
             self._encode_frame_dir_to_video(
                 frame_dir=frame_dir,
-                total_frames=len(frames),
+                total_frames=written,
                 output_path=output_path,
                 duration=duration,
                 audio_path=audio_path
@@ -872,61 +935,255 @@ class VideoGenerator:
         
         logger.info(f"Generated video: {output_path}")
     
+    def _encode_slides_to_video(self, concat_list_path: str, output_path: str,
+                                audio_path: Optional[str] = None, segment: bool = False):
+        """将静帧时间线（concat demuxer 列表）编码为视频
+
+        `segment=True` 时输出闭合 GOP、固定音频参数的片段，便于后续流复制拼接。
+        """
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', concat_list_path,
+        ]
+        has_audio = bool(audio_path and os.path.exists(audio_path))
+        if has_audio:
+            cmd += ['-i', audio_path]
+        cmd += [
+            '-vf', f'fps={self.fps}',
+            '-c:v', self.video_codec,
+            '-pix_fmt', 'yuv420p',
+        ]
+        if segment:
+            cmd += ['-g', str(self.fps * 2), '-flags', '+cgop']
+        if has_audio:
+            cmd += [
+                '-c:a', self.audio_codec,
+                '-b:a', '192k',
+                '-shortest',
+            ]
+            if segment:
+                cmd += ['-ar', '48000', '-ac', '2']
+        cmd += ['-movflags', '+faststart', output_path]
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+        if result.returncode != 0:
+            logger.error(f"FFmpeg error: {result.stderr}")
+            raise RuntimeError(f"FFmpeg failed: {result.stderr}")
+
+        logger.info(f"Generated video: {output_path}")
+
+    def _allocate_subtitle_frames(self, subtitles: List[str], total_frames: int) -> List[int]:
+        """按字幕字数把段落帧数分配给各条字幕（每条至少1帧，总数不变）"""
+        weights = [max(len(s), 1) for s in subtitles]
+        total_weight = sum(weights)
+
+        counts = [
+            max(1, int(total_frames * (weight / total_weight)))
+            for weight in weights
+        ]
+        diff = total_frames - sum(counts)
+        if diff > 0:
+            counts[-1] += diff
+        elif diff < 0:
+            for idx in sorted(
+                range(len(counts)),
+                key=lambda i: counts[i],
+                reverse=True
+            ):
+                if diff == 0:
+                    break
+                reducible = counts[idx] - 1
+                if reducible <= 0:
+                    continue
+                step = min(reducible, -diff)
+                counts[idx] -= step
+                diff += step
+        return counts
+
+    def _build_render_timeline(self, blocks: List[Dict]) -> List[Dict]:
+        """把段落展开为 (段落, 字幕, 帧数) 的渲染时间线"""
+        timeline = []
+        for block in blocks:
+            subtitles = block['subtitles'] or ['']
+            total_block_frames = max(1, int(block['duration'] * self.fps))
+            frame_counts = self._allocate_subtitle_frames(subtitles, total_block_frames)
+            for subtitle, frames in zip(subtitles, frame_counts):
+                timeline.append({'block': block, 'subtitle': subtitle, 'frames': frames})
+        return timeline
+
+    def _render_scene_frame(self, block: Dict, subtitle: str, date_str: str,
+                            weekday_str: str, progress: float = 0.0) -> np.ndarray:
+        """按段落场景渲染一帧画面"""
+        if block['scene'] == 'intro':
+            return self.create_background_frame(
+                date_str,
+                weekday_str,
+                progress,
+                True,
+                subtitle=subtitle
+            )
+        if block['scene'] == 'news':
+            return self.create_news_frame(
+                block['news'],
+                block['index'],
+                block['total'],
+                progress,
+                subtitle=subtitle,
+                display_date=date_str,
+                display_weekday=weekday_str
+            )
+        return self.create_ending_frame(
+            progress,
+            subtitle=subtitle,
+            display_date=date_str,
+            display_weekday=weekday_str
+        )
+
+    def _render_unit(self, unit: Dict) -> Any:
+        """渲染一个工作单元：带 `slide_path` 时落盘并返回路径，否则返回帧"""
+        frame = self._render_scene_frame(
+            unit['block'],
+            unit['subtitle'],
+            unit['date'],
+            unit['weekday'],
+            progress=unit.get('progress', 0.0)
+        )
+        slide_path = unit.get('slide_path')
+        if slide_path:
+            Image.fromarray(frame).save(slide_path, compress_level=1)
+            return slide_path
+        return frame
+
+    def _iter_rendered_units(self, units: Iterable[Dict],
+                             workers: Optional[int] = None) -> Iterable[Any]:
+        """按提交顺序产出渲染结果；多核时由进程池并行渲染"""
+        workers = workers or self.render_workers
+        if workers <= 1:
+            for unit in units:
+                yield self._render_unit(unit)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        # 在途任务数有界，按提交顺序等待最早的任务，先完成的结果暂存在各自的 future 中
+        max_pending = workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_render_worker,
+            initargs=(self.output_dir, self.assets_dir)
+        ) as pool:
+            for unit in units:
+                pending.append(pool.submit(_render_unit_in_worker, unit))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _timeline_unit(self, entry: Dict, date_str: str, weekday_str: str, **extra) -> Dict:
+        """时间线条目转为可跨进程传递的渲染单元"""
+        block = entry['block']
+        unit = {
+            'block': {key: block.get(key) for key in ('scene', 'news', 'index', 'total')},
+            'subtitle': entry['subtitle'],
+            'date': date_str,
+            'weekday': weekday_str,
+        }
+        unit.update(extra)
+        return unit
+
+    def _iter_timeline_frames(self, timeline: List[Dict], date_str: str,
+                              weekday_str: str) -> Iterable[np.ndarray]:
+        """按时间线逐帧渲染（当前进程内：分层合成足够快，进程池回传整帧的开销远大于渲染本身）"""
+        units = (
+            self._timeline_unit(entry, date_str, weekday_str, progress=i / entry['frames'])
+            for entry in timeline
+            for i in range(entry['frames'])
+        )
+        return self._iter_rendered_units(units, workers=1)
+
+    def _write_slide_timeline(self, timeline: List[Dict], date_str: str, weekday_str: str,
+                              slide_dir: str, duration: float,
+                              workers: Optional[int] = None) -> str:
+        """每条字幕渲染一张静帧，写出 concat demuxer 列表并返回其路径"""
+        total_frames = sum(entry['frames'] for entry in timeline)
+        if total_frames <= 0:
+            raise RuntimeError("No frames to encode")
+
+        # 与逐帧模式一致：按音频总时长均摊每帧时长，保证音画对齐
+        seconds_per_frame = duration / total_frames if duration > 0 else 1.0 / self.fps
+
+        units = [
+            self._timeline_unit(
+                entry, date_str, weekday_str,
+                slide_path=os.path.join(slide_dir, f'slide_{i:05d}.png')
+            )
+            for i, entry in enumerate(timeline)
+        ]
+
+        lines = ['ffconcat version 1.0']
+        elapsed_frames = 0
+        slide_name = ''
+        for entry, slide_path in zip(timeline, self._iter_rendered_units(units, workers)):
+            slide_name = os.path.basename(slide_path)
+
+            # 由累计帧数换算起止时间，避免逐条四舍五入造成漂移
+            start = round(elapsed_frames * seconds_per_frame, 6)
+            elapsed_frames += entry['frames']
+            end = round(elapsed_frames * seconds_per_frame, 6)
+            lines.append(f"file '{slide_name}'")
+            lines.append(f"duration {end - start:.6f}")
+
+        # concat demuxer 会忽略最后一条的 duration，需重复最后一张静帧
+        lines.append(f"file '{slide_name}'")
+
+        list_path = os.path.join(slide_dir, 'slides.ffconcat')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return list_path
+
+    def load_subtitle_splits(self, path: str) -> int:
+        """读取预处理阶段生成的 subtitles.json，命中的文本不再请求模型"""
+        return self.subtitle_splitter.load(path)
+
+    async def _split_block_subtitles(self, blocks: List[Dict], max_chars: int = MAX_SUBTITLE_CHARS):
+        """为各段落断句：所有文本合并为一次模型请求，在线程池中执行以免阻塞事件循环"""
+        texts = [block.pop('subtitle_text') for block in blocks]
+        results = await asyncio.to_thread(self.subtitle_splitter.split_batch, texts, max_chars)
+        for block, text, chunks in zip(blocks, texts, results):
+            block['subtitles'] = chunks or [text]
+
     async def generate_video(self, script: Dict, news_items: List) -> str:
         """生成完整的新闻视频"""
         date_str = script.get('date', self._beijing_now().strftime("%m月%d日"))
         weekday_str = script.get('weekday', '')
-        normalized_news = [self._normalize_news_item(item) for item in news_items]
-        news_count = len(normalized_news)
 
         # 构建“段落语音 + 短字幕切片”
         blocks = []
 
-        opening_text = script.get('opening', '欢迎收听听闻天下。')
-        opening_subtitles = self._split_short_subtitles(opening_text, max_chars=12)
+        opening_text = script.get('opening', DEFAULT_OPENING)
         blocks.append({
             'scene': 'intro',
             'tts_text': opening_text,
-            'subtitles': opening_subtitles or [opening_text]
+            'subtitle_text': opening_text
         })
 
-        domestic_script = script.get('domestic_news', [])
-        international_script = script.get('international_news', [])
-        script_news = script.get('news', [])
-
-        # 兼容旧脚本结构：从 `news` 字段推断分组
-        if not domestic_script and not international_script and isinstance(script_news, list):
-            for item in script_news:
-                if not isinstance(item, dict):
-                    continue
-                section = str(item.get('section', 'domestic')).strip().lower()
-                if section == 'international':
-                    international_script.append(item)
-                else:
-                    domestic_script.append(item)
-
-        # 若脚本中无AI产出的结构，兜底使用原始新闻
-        if not domestic_script and not international_script and normalized_news:
-            for news in normalized_news:
-                title = (news['title'] or '今日要闻').strip()[:28]
-                summary = (news['summary'] or '').strip()[:36]
-                domestic_script.append({
-                    'title': title,
-                    'content': f"{title}。{summary}。",
-                    'subtitle': f"{title}。{summary}。",
-                    'section': 'domestic'
-                })
+        # 分组规则（含旧脚本兼容与原始新闻兜底）与预处理阶段共用，段落文本与 subtitles.json 一致
+        domestic_script, international_script = script_sections(script, news_items)
 
         total_script_news = len(domestic_script) + len(international_script)
         if total_script_news == 0:
             logger.warning("No news blocks provided, generating intro/outro only video")
         else:
             if domestic_script:
-                section_text = "先看国内新闻。"
+                section_text = DOMESTIC_HEADER
                 blocks.append({
                     'scene': 'news',
                     'tts_text': section_text,
-                    'subtitles': self._split_short_subtitles(section_text, max_chars=12) or [section_text],
+                    'subtitle_text': section_text,
                     'news': {},
                     'index': 1,
                     'total': max(total_script_news, 1)
@@ -941,18 +1198,18 @@ class VideoGenerator:
                     blocks.append({
                         'scene': 'news',
                         'tts_text': numbered_tts_text,
-                        'subtitles': self._split_short_subtitles(subtitle_text, max_chars=12) or [subtitle_text],
+                        'subtitle_text': subtitle_text,
                         'news': {},
                         'index': idx,
                         'total': max(total_script_news, 1)
                     })
 
             if international_script:
-                section_text = "再看国际新闻。"
+                section_text = INTERNATIONAL_HEADER
                 blocks.append({
                     'scene': 'news',
                     'tts_text': section_text,
-                    'subtitles': self._split_short_subtitles(section_text, max_chars=12) or [section_text],
+                    'subtitle_text': section_text,
                     'news': {},
                     'index': max(len(domestic_script), 1),
                     'total': max(total_script_news, 1)
@@ -967,117 +1224,161 @@ class VideoGenerator:
                     blocks.append({
                         'scene': 'news',
                         'tts_text': numbered_tts_text,
-                        'subtitles': self._split_short_subtitles(subtitle_text, max_chars=12) or [subtitle_text],
+                        'subtitle_text': subtitle_text,
                         'news': {},
                         'index': idx,
                         'total': max(total_script_news, 1)
                     })
 
-        closing_text = script.get('closing', '以上就是今天的新闻播报，感谢收听，我们明天再见。')
-        closing_subtitles = self._split_short_subtitles(closing_text, max_chars=12)
+        closing_text = script.get('closing', DEFAULT_CLOSING)
         blocks.append({
             'scene': 'outro',
             'tts_text': closing_text,
-            'subtitles': closing_subtitles or [closing_text]
+            'subtitle_text': closing_text
         })
 
         if not blocks:
             raise RuntimeError("No blocks generated for audio/video rendering")
 
+        await self._split_block_subtitles(blocks)
+
+        timestamp = self._beijing_now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(self.output_dir, f'daily_news_{timestamp}.mp4')
+
+        if self.encode_mode == 'segments':
+            await self._generate_segmented_video(blocks, date_str, weekday_str, output_path)
+        else:
+            await self._generate_single_pass_video(blocks, date_str, weekday_str, output_path)
+
+        for cache in (self.block_cache, self.tts_cache):
+            if cache:
+                logger.info(cache.summary())
+        logger.info(self.subtitle_splitter.llm_client.summary())
+        logger.info(self.subtitle_splitter.llm_client.rate_limiter.summary())
+        logger.info(f"Video generation complete: {output_path}")
+        return output_path
+
+    def _block_cache_key(self, block: Dict, date_str: str, weekday_str: str) -> str:
+        """段落缓存键：口播文本、字幕、音色、日期、渲染参数与代码版本"""
+        return DiskCache.make_key({
+            'tts_text': block['tts_text'],
+            'subtitles': block['subtitles'],
+            'scene': block['scene'],
+            'engine': self.tts_engine,
+            'voice': self.tts_voice,
+            'rate': self.tts_rate,
+            'volume': self.tts_volume,
+            'date': date_str,
+            'weekday': weekday_str,
+            'render': {
+                'width': self.width,
+                'height': self.height,
+                'fps': self.fps,
+                'video_codec': self.video_codec,
+                'audio_codec': self.audio_codec,
+                'render_mode': self.render_mode,
+                'encode_mode': self.encode_mode,
+            },
+            'code': _render_code_version(),
+        })
+
+    async def _prepare_block_audio(self, block: Dict, index: int,
+                                   date_str: str, weekday_str: str) -> str:
+        """生成段落音频并写入 `block['duration']`；命中段落缓存时直接复用"""
+        block_audio_path = os.path.join(self.temp_dir, f'block_{index:03d}.mp3')
+        block['cache_key'] = None
+        block['cache_hit'] = False
+        block['cached_segment'] = None
+        if self.block_cache:
+            key = self._block_cache_key(block, date_str, weekday_str)
+            block['cache_key'] = key
+            # 缓存读取与文件复制在线程中进行，不阻塞事件循环
+            meta = await asyncio.to_thread(self._load_block_cache, key, block_audio_path)
+            if meta:
+                block['duration'] = meta['duration']
+                block['cache_hit'] = True
+                if meta.get('segment'):
+                    block['cached_segment'] = self.block_cache.path(key, meta['segment'])
+                logger.info(f"Block {index} reused from cache ({meta['duration']:.2f}s)")
+                return block_audio_path
+
+        block_duration = await self.generate_audio(block['tts_text'], block_audio_path)
+        block['duration'] = max(block_duration, 0.6)
+        return block_audio_path
+
+    def _load_block_cache(self, key: str, output_path: str) -> Optional[Dict]:
+        """命中时复制段落音频到 `output_path` 并返回元数据"""
+        meta = self.block_cache.get(key)
+        if not meta:
+            return None
+        try:
+            shutil.copyfile(self.block_cache.path(key, meta['audio']), output_path)
+        except OSError as e:
+            logger.warning(f"Failed to read block cache entry {key[:12]}: {e}")
+            return None
+        return meta
+
+    def _store_block_cache(self, block: Dict, audio_path: str, segment_path: str):
+        """写入段落音频与片段（已命中、TTS 兜底静音或兜底引擎/音色合成的段落不写入；会复制文件，勿在事件循环中直接调用）"""
+        key = block.get('cache_key')
+        if not self.block_cache or not key or block.get('cache_hit'):
+            return
+        if audio_path in self._failed_audio_paths or audio_path in self._fallback_audio_paths:
+            return
+
+        audio_name = 'audio' + os.path.splitext(audio_path)[1]
+        meta = {'duration': block['duration'], 'audio': audio_name, 'segment': 'segment.mp4'}
+        files = {audio_name: audio_path, 'segment.mp4': segment_path}
+        self.block_cache.put(key, meta, files=files)
+
+    async def _generate_single_pass_video(self, blocks: List[Dict], date_str: str,
+                                          weekday_str: str, output_path: str):
+        """全部音频就绪后，整片一次编码"""
         # 按段落生成音频（调用次数少，稳定性更高）
-        block_audio_paths = []
-        for i, block in enumerate(blocks):
-            block_audio_path = os.path.join(self.temp_dir, f'block_{i:03d}.mp3')
-            block_duration = await self.generate_audio(block['tts_text'], block_audio_path)
-            block['duration'] = max(block_duration, 0.6)
-            block_audio_paths.append(block_audio_path)
+        semaphore = asyncio.Semaphore(self.tts_concurrency)
+
+        async def prepare(index: int, block: Dict) -> str:
+            async with semaphore:
+                return await self._prepare_block_audio(block, index, date_str, weekday_str)
+
+        # 并发合成，gather 按段落顺序返回
+        block_audio_paths = list(await asyncio.gather(
+            *(prepare(i, block) for i, block in enumerate(blocks))
+        ))
 
         # 合并音频片段
-        audio_path = os.path.join(self.temp_dir, 'full_audio.mp3')
-        self.concat_audio_segments(block_audio_paths, audio_path)
-        audio_duration = self._get_audio_duration(audio_path)
+        audio_path = os.path.join(self.temp_dir, 'full_audio.wav')
+        audio_duration = await asyncio.to_thread(
+            self.concat_audio_segments,
+            block_audio_paths, audio_path, [block['duration'] for block in blocks]
+        )
         logger.info(f"Total audio duration: {audio_duration:.2f}s")
 
-        # 根据每段音频时长和字幕切片渲染画面（逐帧落盘，避免内存暴涨）
+        # 根据每段音频时长和字幕切片渲染画面
         import tempfile
         import shutil
 
-        frame_dir = tempfile.mkdtemp()
-        total_frames = 0
-        try:
-            for block in blocks:
-                subtitles = block['subtitles'] or ['']
-                total_block_frames = max(1, int(block['duration'] * self.fps))
-                weights = [max(len(s), 1) for s in subtitles]
-                total_weight = sum(weights)
-
-                subtitle_frame_counts = [
-                    max(1, int(total_block_frames * (weight / total_weight)))
-                    for weight in weights
-                ]
-                diff = total_block_frames - sum(subtitle_frame_counts)
-                if diff > 0:
-                    subtitle_frame_counts[-1] += diff
-                elif diff < 0:
-                    for idx in sorted(
-                        range(len(subtitle_frame_counts)),
-                        key=lambda i: subtitle_frame_counts[i],
-                        reverse=True
-                    ):
-                        if diff == 0:
-                            break
-                        reducible = subtitle_frame_counts[idx] - 1
-                        if reducible <= 0:
-                            continue
-                        step = min(reducible, -diff)
-                        subtitle_frame_counts[idx] -= step
-                        diff += step
-
-                for subtitle, subtitle_frames in zip(subtitles, subtitle_frame_counts):
-                    for i in range(subtitle_frames):
-                        progress = i / subtitle_frames
-                        if block['scene'] == 'intro':
-                            frame = self.create_background_frame(
-                                date_str,
-                                weekday_str,
-                                progress,
-                                True,
-                                subtitle=subtitle
-                            )
-                        elif block['scene'] == 'news':
-                            frame = self.create_news_frame(
-                                block['news'],
-                                block['index'],
-                                block['total'],
-                                progress,
-                                subtitle=subtitle,
-                                display_date=date_str,
-                                display_weekday=weekday_str
-                            )
-                        else:
-                            frame = self.create_ending_frame(
-                                progress,
-                                subtitle=subtitle,
-                                display_date=date_str,
-                                display_weekday=weekday_str
-                            )
-
-                        frame_path = os.path.join(frame_dir, f"frame_{total_frames:06d}.png")
-                        Image.fromarray(frame).save(frame_path)
-                        total_frames += 1
-
-            # 生成视频
-            timestamp = self._beijing_now().strftime("%Y%m%d_%H%M%S")
-            output_path = os.path.join(self.output_dir, f'daily_news_{timestamp}.mp4')
-            self._encode_frame_dir_to_video(
-                frame_dir=frame_dir,
-                total_frames=total_frames,
+        timeline = self._build_render_timeline(blocks)
+
+        if self.render_mode == 'slide':
+            # 同一条字幕的画面不随帧变化：每条只渲染一次，由 concat 时间线控制时长
+            render_dir = tempfile.mkdtemp()
+            try:
+                list_path = self._write_slide_timeline(
+                    timeline, date_str, weekday_str, render_dir, audio_duration
+                )
+                logger.info(f"Rendered {len(timeline)} slides for {audio_duration:.2f}s timeline")
+                self._encode_slides_to_video(list_path, output_path, audio_path=audio_path)
+            finally:
+                shutil.rmtree(render_dir, ignore_errors=True)
+        else:
+            self._encode_frames(
+                lambda: self._iter_timeline_frames(timeline, date_str, weekday_str),
+                total_frames=sum(entry['frames'] for entry in timeline),
                 output_path=output_path,
                 duration=audio_duration,
                 audio_path=audio_path
             )
-        finally:
-            shutil.rmtree(frame_dir, ignore_errors=True)
 
         # 清理临时文件
         for block_audio_path in block_audio_paths:
@@ -1086,8 +1387,149 @@ class VideoGenerator:
         if os.path.exists(audio_path):
             os.remove(audio_path)
 
-        logger.info(f"Video generation complete: {output_path}")
-        return output_path
+    async def _generate_segmented_video(self, blocks: List[Dict], date_str: str,
+                                        weekday_str: str, output_path: str):
+        """逐段编码：每段音频就绪即提交编码，多个 ffmpeg 并行，最后流复制拼接
+
+        字体注册表、字幕块与静态层缓存、字宽缓存均非线程安全，静帧只在单个渲染线程中串行绘制；
+        编码线程池只运行 ffmpeg。
+        """
+        import tempfile
+        import shutil
+        from concurrent.futures import ThreadPoolExecutor
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.tts_concurrency)
+        segment_dir = tempfile.mkdtemp()
+        block_audio_paths = []
+        render_pool = ThreadPoolExecutor(max_workers=1)
+        pool = ThreadPoolExecutor(max_workers=self.segment_workers)
+
+        async def process(index: int, block: Dict) -> str:
+            async with semaphore:
+                block_audio_path = await self._prepare_block_audio(
+                    block, index, date_str, weekday_str
+                )
+            block_audio_paths.append(block_audio_path)
+
+            # 音频一就绪即提交编码，不等待其余段落的 TTS
+            segment_path = os.path.join(segment_dir, f'segment_{index:03d}.mp4')
+            cached_segment = block.get('cached_segment')
+            if cached_segment:
+                await loop.run_in_executor(pool, shutil.copyfile, cached_segment, segment_path)
+                return segment_path
+            list_path = await loop.run_in_executor(
+                render_pool, self._render_block_slides, block, date_str, weekday_str
+            )
+            return await loop.run_in_executor(
+                pool,
+                self._encode_block_segment,
+                block, block_audio_path, list_path, segment_path
+            )
+
+        try:
+            tasks = [asyncio.create_task(process(i, block)) for i, block in enumerate(blocks)]
+            try:
+                segment_paths = await asyncio.gather(*tasks)
+            except BaseException:
+                # 任一段落失败即取消其余段落，并等待它们退出，之后不再有协程写入临时目录
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            finally:
+                # 在线程中关闭线程池：排队中的编码直接取消，正在运行的 ffmpeg 结束前不阻塞事件循环
+                await asyncio.to_thread(render_pool.shutdown, wait=True, cancel_futures=True)
+                await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+            total_duration = sum(block['duration'] for block in blocks)
+            logger.info(f"Encoded {len(segment_paths)} segments, total {total_duration:.2f}s")
+            await asyncio.to_thread(self._concat_segments, segment_paths, output_path)
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+            for block_audio_path in block_audio_paths:
+                if os.path.exists(block_audio_path):
+                    os.remove(block_audio_path)
+
+    def _render_block_slides(self, block: Dict, date_str: str, weekday_str: str) -> str:
+        """渲染单个段落的静帧，返回 concat 列表路径（须在渲染线程中调用）"""
+        import tempfile
+        import shutil
+
+        slide_dir = tempfile.mkdtemp()
+        try:
+            timeline = self._build_render_timeline([block])
+            # 段落内静帧很少，直接在当前线程渲染，并行度由 ffmpeg 进程数提供
+            return self._write_slide_timeline(
+                timeline, date_str, weekday_str, slide_dir, block['duration'], workers=1
+            )
+        except Exception:
+            shutil.rmtree(slide_dir, ignore_errors=True)
+            raise
+
+    def _encode_block_segment(self, block: Dict, audio_path: str, list_path: str,
+                              segment_path: str) -> str:
+        """把已渲染的段落静帧编码为独立的闭合 GOP 片段（只运行 ffmpeg，可在线程池中并行）"""
+        import shutil
+
+        try:
+            self._encode_slides_to_video(list_path, segment_path, audio_path=audio_path, segment=True)
+        finally:
+            shutil.rmtree(os.path.dirname(list_path), ignore_errors=True)
+        self._store_block_cache(block, audio_path, segment_path)
+        return segment_path
+
+    def _concat_segments(self, segment_paths: List[str], output_path: str):
+        """concat demuxer + 流复制拼接片段，不再重新编码"""
+        list_path = os.path.abspath(os.path.join(self.temp_dir, 'video_segments.txt'))
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in segment_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', list_path,
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            output_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+        if os.path.exists(list_path):
+            os.remove(list_path)
+
+        if result.returncode != 0:
+            logger.error(f"Segment concat error: {result.stderr}")
+            raise RuntimeError(f"Failed to concat segments: {result.stderr}")
+
+        logger.info(f"Generated video: {output_path}")
+
+@lru_cache(maxsize=1)
+def _render_code_version() -> str:
+    """渲染相关源码的哈希，代码变更后段落缓存自动失效"""
+    src_dir = Path(__file__).resolve().parent
+    digest = hashlib.sha256()
+    for name in ('video_generator.py', 'font_registry.py', 'text_layout.py', 'frame_encoder.py'):
+        path = src_dir / name
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+_render_worker: Optional[VideoGenerator] = None
+
+
+def _init_render_worker(output_dir: str, assets_dir: str):
+    """渲染进程初始化：每个进程持有一份预热的生成器（背景、字体、logo）"""
+    global _render_worker
+    _render_worker = VideoGenerator(output_dir=output_dir, assets_dir=assets_dir)
+
+
+def _render_unit_in_worker(unit: Dict) -> Any:
+    return _render_worker._render_unit(unit)
 
 
 if __name__ == '__main__':